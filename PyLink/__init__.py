@@ -43,6 +43,12 @@ from pymol.cgo import *
 from pymol import cmd
 from pymol import util
 
+try:
+    from . import gln
+    from . import converter
+except ImportError:
+    print("  ### NumPy library not found. Please install it and re-run the plugin.")
+
 try:
     import matplotlib as mplt
     #mplt.use('TkAgg')
@@ -74,7 +80,8 @@ GUI_PARS = {
     'CHAIN_ARRAY_ROW_WIDTH': [58, 58, 50],
     'GLN_CONTENT_ROW_NAME_WIDTH': [5, 5, 11],
     'GLN_CONTENT_ELEMENT_WIDTH': [30, 30, 10],
-    'FIX_GLX_MATRICES': [-0.24, -0.24, -0.28]
+    'FIX_GLX_MATRICES': [-0.24, -0.24, -0.28],
+    'GLN_MATRIX_PIXELS': [400, 495, 340]
 }
 
 def gui_par(par):
@@ -193,7 +200,8 @@ class PyLink:
         for idx, filepath in enumerate(self._full_path_to_files):
             filename = filepath.split(os.sep)[-1]
             if filename.endswith("pdb"):
-                if self.is_input_marcolink(idx):
+                metadata = converter.pdb_metadata(filepath)
+                if self.is_input_marcolink(metadata):
                     self.is_macrolink = True
                     filename = filepath.split(os.sep)[-1][:-4] + "_CA.pdb"
                     self.simplify_macrolink_to_ca(filepath)
@@ -205,7 +213,7 @@ class PyLink:
                     self._filenames.append(filepath.split(os.sep)[-1])
                     self._is_file_xyz[filename[:-4]] = False
                     self._is_file_macrolink[filename[:-4]] = False
-                self._contains_bridge[filename[:-4]] = self.contains_bridge_data(idx)
+                self._contains_bridge[filename[:-4]] = self.contains_bridge_data(metadata)
             else:
                 self._filenames.append(filepath.split(os.sep)[-1][:-4] + "_xyz2.pdb")
                 self._is_file_xyz[self._filenames[-1][:-4]] = True
@@ -221,11 +229,8 @@ class PyLink:
             self._chains.append(structure)
         print("  Structures reloaded...")
 
-    def is_input_marcolink(self, file_idx):
-        input_file = open(self._full_path_to_files[file_idx], "r").read()
-        expdata = list(re.findall('^MODEL|SOLUTION NMR', input_file, flags=re.M | re.S))
-
-        return "MODEL" in expdata and "SOLUTION NMR" not in expdata
+    def is_input_marcolink(self, metadata):
+        return metadata['models'] > 0 and not metadata['nmr']
 
     def simplify_macrolink_to_ca(self, filename):
         macrolink_ca_only = open(filename[:-4] + "_CA.pdb", "w")
@@ -237,11 +242,8 @@ class PyLink:
                     macrolink_ca_only.write(line)
         macrolink_ca_only.close()
 
-    def contains_bridge_data(self, file_idx):
-        input_file = open(self._full_path_to_files[file_idx], "r").read()
-        ss_bonds = list(re.findall('SSBOND|LINK', input_file, flags=re.M | re.S))
-
-        return len(ss_bonds) != 0
+    def contains_bridge_data(self, metadata):
+        return metadata['ssbond'] or metadata['link']
 
     def convert_xyz_to_pdb(self, current_file, path_to_xyz_file, new_xyz_file, ch=None):
         output_file = open(path_to_xyz_file + os.sep + new_xyz_file, 'w')
@@ -3325,21 +3327,25 @@ class PyLink:
 
         hashcode = self.output_data[self.selected_chains_links[self.displayed_filechain]][1]
         if hasattr(self, "link_inf_is_smoothed") and self.link_inf_is_smoothed.get():
-            target_dir = self.link_directory + os.sep + hashcode + os.sep + "_sm"
             working_dir = self.link_directory + os.sep + hashcode + os.sep + "_sm"
         else:
-            target_dir = self.link_directory + os.sep + hashcode
             working_dir = self._full_path_to_dir if self.is_ions else self.link_directory
         if self.notebook.getcurselection() == "Probabilistic":
             command = self.generate_gln_probabilistic(content, working_dir)
         else:
             command = self.generate_gln_deterministic(content, working_dir)
 
+        # GLN matrices are computed in-process by the same engine GLNtoPNG.py uses, no PNG files are written;
+        # results are cached in the polymer directory, so viewing the same link again costs one file read
+        f = 1 if self.is_win() else 0
+        result = None
         try:
-            subprocess.Popen(command.split(" "), stdout=subprocess.PIPE, cwd=self._full_path_to_dir).communicate()[0]
-            if self.is_ions:
-                self.separate_files_to_directory(self._full_path_to_dir, target_dir, hashcode + "_GLN_.*.png")
-            self.separate_files_to_directory(self._full_path_to_dir if self.is_win() else self.link_directory, target_dir, hashcode + "_GLN_.*.png")
+            options = gln.parse_arguments(command.split(" ")[f:])
+            (index1, comp1), (index2, comp2) = [
+                gln.read_chain(os.path.join(self._full_path_to_dir, filename), begin, end, options['sidecar'])
+                for filename, begin, end in options['components']]
+            cache = gln.Cache(self.link_directory + os.sep + "_gln_cache")
+            result = cache.compute(comp1, comp2, options['close'], options['loop'], options['ion'], matrices=False)
         except Exception:
             self.raise_popup_menu("The GLN value is equal to 0. No GLN files were generated.")
 
@@ -3351,41 +3357,98 @@ class PyLink:
         win_gln_matrices.grid(column=0, row=len(self.gln_array_of_results)+2, columnspan=4 if self.is_win() else 5)
         gln_matrices = mplt.figure.Figure(figsize=self.gln_fig_size, dpi=self.gln_fig_dpi, facecolor='white')
 
-        files = command.split(" ")
-        f = 1 if self.is_win() else 0
-        if self.is_macrolink:
-            if hasattr(self, "link_inf_is_smoothed") and self.link_inf_is_smoothed.get():
-                file1 = files[1+f].split(os.sep)[-1][:-4].split("macro_")[1].split("_L")[0]
-                file2 = files[4+f].split(os.sep)[-1][:-4].split("macro_")[1].split("_L")[0]
-            else:
-                file1 = files[1+f].split(os.sep)[-1][:-4].split("macro_")[1]
-                file2 = files[4+f].split(os.sep)[-1][:-4].split("macro_")[1]
-        elif hasattr(self, "link_inf_is_smoothed") and self.link_inf_is_smoothed.get():
-            file1 = files[1+f].split(os.sep)[-1].split(".pdb_")[1][0]
-            if self.notebook.getcurselection() == "Probabilistic":
-                file2 = files[2+f].split(os.sep)[-1].split(".pdb_")[1][0]
-            else:
-                file2 = files[4+f].split(os.sep)[-1].split(".pdb_")[1][0]
-        else:
-            if self.is_ions:
-                file1 = files[1+f].split(os.sep)[-1][:-4].split(".pdb_")[1][0]
-            else:
-                file1 = files[1+f].split(os.sep)[-1][:-4][-1]
-            file2 = files[4+f].split(os.sep)[-1][:-4].split(".pdb_")[1][0]
-        name1 = hashcode + "_GLN_1" + file1 + "-2" + file2 + ".png"
-        name2 = hashcode + "_GLN_2" + file2 + "-1" + file1 + ".png"
-
-        for idx, img in enumerate([name1, name2]):
-            self.fix_gln_matrices(gln_matrices, idx)
-            img = mpimg.imread(target_dir + os.sep + img)
-            gln_matrices.axes[idx].imshow(img, zorder=0)
+        views = []
+        if result is not None:
+            for idx, (loop, index) in enumerate([("1", index2), ("2", index1)]):  # the sub-chains of the other comp
+                self.fix_gln_matrices(gln_matrices, idx)
+                views.append(self.draw_gln_matrix(gln_matrices.axes[idx], result["P" + loop], result[loop], index))
 
         gln_matrices_canvas = FigureCanvasTkAgg(gln_matrices, master=win_gln_matrices.interior())
         gln_matrices_canvas._tkcanvas.pack(side=tk.TOP, fill=tk.BOTH, expand=1)
         gln_matrices_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        gln_matrices_canvas.mpl_connect('scroll_event', lambda event: self.zoom_gln_matrix(event, views))
+        gln_matrices_canvas.mpl_connect('button_press_event', lambda event: self.pan_gln_matrix(event, views))
+        gln_matrices_canvas.mpl_connect('motion_notify_event', lambda event: self.pan_gln_matrix(event, views))
+        gln_matrices_canvas.mpl_connect('button_release_event', lambda event: self.pan_gln_matrix(event, views))
         gln_matrices_canvas.draw()
         print("  GLN matrices displayed...")
 
+    def draw_gln_matrix(self, axes, P, summary, index):
+        # draw one GLN matrix the way GLNtoPNG.py draws it: linksLOOP[i][j] = P[j] - P[i] at column i and row j,
+        # extrema marked; the picture comes from a gln.Pyramid, so zooming and panning only look up its tiles.
+        # index - residue indices of the points of the comp the cells run over, for the axis labels
+        view = {'axes': axes, 'pyramid': gln.Pyramid(P), 'cells': [0, len(P), 0, len(P)], 'image': None,
+                'press': None, 'index': index, 'labels': []}
+        for k in ["min", "max"]:
+            x, y = summary["x" + k], summary["y" + k]
+            axes.scatter([x + 0.5], [y + 0.5], s=40, color=gln.rgb(P[y] - P[x]) / 255.0, edgecolors="black",
+                         zorder=1)
+        axes.text(0.55, 0.91, "min GLN = " + str(summary["min"]) + "\nmax GLN = " + str(summary["max"]),
+                  transform=axes.transAxes, fontsize=8)
+        self.redraw_gln_matrix(view)
+        return view
+
+    def redraw_gln_matrix(self, view):
+        i0, i1, j0, j1 = view['cells']
+        picture, extent = view['pyramid'].image(i0, i1, j0, j1, gui_par('GLN_MATRIX_PIXELS'))
+        if view['image'] is not None:
+            view['image'].remove()
+        view['image'] = view['axes'].imshow(picture, zorder=0, interpolation="nearest", extent=extent)
+        view['axes'].set_xlim(i0, i1)
+        view['axes'].set_ylim(j1, j0)
+        self.label_gln_matrix(view)
+
+    def label_gln_matrix(self, view):
+        # residue indices along the bottom and the left edge of the shown cells, as the axes of the PNG files
+        for label in view['labels']:
+            label.remove()
+        view['labels'] = []
+        i0, i1, j0, j1 = view['cells']
+        index, span = view['index'], i1 - i0
+        if len(index) == 0: return
+        step = max(1, span // 50 * 10 if span > 150 else span // 25 * 5 if span > 50 else span // 5)
+        for axis, first, last in (('x', i0, i1), ('y', j0, j1)):
+            for cell in range((first // step + 1) * step, last - step // 2, step):  # none at the far edge
+                name = str(index[cell % len(index)])  # the closing point of a closed comp is its first one
+                if axis == 'x':
+                    label = view['axes'].text(cell, j1, name, ha="center", va="bottom", fontsize=7, color="0.2")
+                else:
+                    label = view['axes'].text(i0, cell, "-" + name, ha="left", va="center", fontsize=7, color="0.2")
+                view['labels'].append(label)
+
+    def move_gln_matrix(self, view, i0, j0, span):
+        # show span x span cells from column i0 and row j0, kept inside the matrix
+        N = view['pyramid'].N
+        span = int(round(min(N, max(4, span))))
+        i0, j0 = int(round(min(max(0, i0), N - span))), int(round(min(max(0, j0), N - span)))
+        view['cells'] = [i0, i0 + span, j0, j0 + span]
+        self.redraw_gln_matrix(view)
+
+    def zoom_gln_matrix(self, event, views):
+        # mouse wheel: zoom in (up) or out (down) twice around the pointed cell
+        for view in views:
+            if event.inaxes is view['axes'] and event.xdata is not None:
+                i0, i1, j0, j1 = view['cells']
+                factor = 0.5 if event.button == 'up' else 2.0
+                self.move_gln_matrix(view, event.xdata - (event.xdata - i0) * factor,
+                                     event.ydata - (event.ydata - j0) * factor, (i1 - i0) * factor)
+                event.canvas.draw_idle()
+
+    def pan_gln_matrix(self, event, views):
+        # dragging with a mouse button moves the shown part of the matrix; the drag is measured in pixels from where
+        # the button was pressed, against the cells shown then, as the data coordinates change with every redraw
+        for view in views:
+            if event.name == 'button_release_event':
+                view['press'] = None
+            elif event.name == 'button_press_event':
+                if event.inaxes is view['axes']: view['press'] = (event.x, event.y, list(view['cells']))
+            elif view['press'] is not None:
+                x, y, (i0, i1, j0, j1) = view['press']
+                box = view['axes'].bbox  # pixels of the shown cells, rows grow downwards
+                self.move_gln_matrix(view, i0 - (event.x - x) * (i1 - i0) / box.width,
+                                     j0 + (event.y - y) * (j1 - j0) / box.height, i1 - i0)
+                event.canvas.draw_idle()
+
     def generate_gln_deterministic(self, cnt, link_dir):
         comb = self.selected_chains_links[self.displayed_filechain]
         hashcode = self.output_data[self.selected_chains_links[self.displayed_filechain]][1]
@@ -9,6 +9,11 @@ import glob
 import time
 from math import sqrt
 
+try:
+    import gln  # GLN engine placed next to this script, used by --lasso
+except ImportError:
+    gln = None
+
 ################ CONSTANTS ################
 date = "07.05.2018"
 global amino_acids, nucleotides, names, WandaLassoProgram, min_loop_length, artifact_gap_size, bridge_max_length, close_residues_cutoff
@@ -22,6 +27,12 @@ min_loop_length = 5  # smallest loop size allowed
 artifact_gap_size = 6  # smallest gap size to rise warning and classify structure to artifacts
 bridge_max_length = 12  # maximal length of the bridge to exist
 close_residues_cutoff = 4.6  # which residues treat as close enough
+header_records = {'HEADER': 'add_header', 'OBSLTE': 'add_obsolete', 'TITLE ': 'add_title', 'SPLIT ': 'add_split',
+                  'CAVEAT': 'add_caveat', 'COMPND': 'add_compound', 'SOURCE': 'add_source', 'KEYWDS': 'add_keywords',
+                  'EXPDTA': 'add_expmethod', 'NUMMDL': 'add_nummdl', 'REMARK 465': 'add_missing_residue',
+                  'REMARK 470': 'add_zero_occupancy_residue', 'REMARK 480': 'add_zero_occupancy_atom',
+                  'SEQRES': 'add_residue', 'SSBOND': 'add_bond', 'LINK  ': 'add_bond'}  # record type -> PDB_File method
+coordinate_records = {'MODEL ', 'ENDMDL', 'ATOM  ', 'HETATM', 'TER   ', 'END   '}  # records kept for read_coordinates
 
 
 ################ FUNCTIONS ################
@@ -81,51 +92,33 @@ def read_header(pdb_file, args):  # reading header of PDB file
         if f[:6] != 'macro_': os.remove(f)  # removing files on start
     for f in glob.glob(input_file + '_*.xyz'):
         if f[:6] != 'macro_': os.remove(f)  # removing files on start
+    if type(debug) is list: print(time.strftime("%d %b %H:%M:%S",
+                                                time.gmtime()) + " File " + input_file + " opened. Analyzing the header.")
+    scan_pdb(pdb_file, input_file)
+    return
+
+
+def scan_pdb(pdb_file, input_file, records=True):  # one pass over PDB file: header, bridges and coordinate records
+    # coordinate records are kept for read_coordinates only with records, pdb_metadata needs just their counts
+    header = True
     with open(input_file, 'r') as f:
-        if type(debug) is list: print(time.strftime("%d %b %H:%M:%S",
-                                                    time.gmtime()) + " File " + input_file + " opened. Analyzing the header.")
         for line in f:
-            if line[0:6] == 'HEADER': pdb_file.add_header(line)
-            if line[0:6] == 'OBSLTE': pdb_file.add_obsolete(line)
-            if line[0:6] == 'TITLE ': pdb_file.add_title(line)
-            if line[0:6] == 'SPLIT ': pdb_file.add_split(line)
-            if line[0:6] == 'CAVEAT': pdb_file.add_caveat(line)
-            if line[0:6] == 'COMPND': pdb_file.add_compound(line)
-            if line[0:6] == 'SOURCE': pdb_file.add_source(line)
-            if line[0:6] == 'KEYWDS': pdb_file.add_keywords(line)
-            if line[0:6] == 'EXPDTA': pdb_file.add_expmethod(line)
-            if line[0:6] == 'NUMMDL': pdb_file.add_nummdl(line)
-            #    if line[0:6] == 'MDLTYP': pdb_file.add_nummdl(line)
-            #    if line[0:6] == 'AUTHOR': pdb_file.add_author(line)
-            #    if line[0:6] == 'REVDAT': pdb_file.add_revdat(line)
-            #    if line[0:6] == 'SPRSDE': pdb_file.add_sprsde(line)
-            #    if line[0:6] == 'JRNL  ': pdb_file.add_journal(line)
-            if line[0:10] == 'REMARK 465': pdb_file.add_missing_residue(line)
-            if line[0:10] == 'REMARK 470': pdb_file.add_zero_occupancy_residue(line)
-            #    if line[0:10] == 'REMARK 475': pdb_file.add_missing_atom(line)
-            if line[0:10] == 'REMARK 480': pdb_file.add_zero_occupancy_atom(line)
-            #    if line[0:6] == 'DBREF ': pdb_file.add_dbref(line)
-            #    if line[0:6] == 'SEQADV': pdb_file.add_seqadv(line)
-            if line[0:6] == 'SEQRES': pdb_file.add_residue(line)
-            #    if line[0:6] == 'MODRES': pdb_file.add_modres(line)
-            #    if line[0:6] == 'HET   ': pdb_file.add_het(line)
-            #    if line[0:6] == 'HETNAM': pdb_file.add_hetnam(line)
-            #    if line[0:6] == 'HETSYN': pdb_file.add_hetsyn(line)
-            #    if line[0:6] == 'FORMUL': pdb_file.add_formul(line)
-            #    if line[0:6] == 'HELIX ': pdb_file.add_helix(line)
-            #    if line[0:6] == 'SHEET ': pdb_file.add_sheet(line)
-            if line[0:6] == 'SSBOND': pdb_file.add_bond(line)
-            if line[0:6] == 'LINK  ': pdb_file.add_bond(line)
-            #    if line[0:6] == 'CISPEP': pdb_file.add_cispep(line)
-            #    if line[0:6] == 'SITE  ': pdb_file.add_site(line)
-            #    if line[0:6] == 'CRYST1': pdb_file.add_cryst1(line)
-            #    if line[0:6] == 'ORIGX1': pdb_file.add_origx1(line)
-            #    if line[0:6] == 'SCALE1': pdb_file.add_scale1(line)
-            #    if line[0:6] == 'MTRIX1': pdb_file.add_mtrix1(line)
-            if line[0:6] == 'ATOM  ' or line[0:6] == 'HETATM': break
+            record = line[0:6]
+            if record in coordinate_records:
+                pdb_file.add_record(line, records)
+                if record == 'ATOM  ' or record == 'HETATM': header = False  # header ends with the first atom
+            elif header:
+                method = header_records.get(line[0:10] if record == 'REMARK' else record)
+                if method: getattr(pdb_file, method)(line)
     return
 
 
+def pdb_metadata(input_file):  # what the plugin needs to know about the PDB file, read in one pass
+    pdb_file = PDB_File({'input_file': input_file})
+    scan_pdb(pdb_file, input_file, records=False)
+    return pdb_file.metadata()
+
+
 def parse_atoms(args):  # models,chains,residues,atoms,debug):
     models = args['models']
     chains = args['chains']
@@ -205,7 +198,8 @@ def parse_atoms(args):  # models,chains,residues,atoms,debug):
         permitted_models) + color.BOLD + "\tChains:" + color.END + str(
         permitted_chains) + color.BOLD + "\tResidues:" + color.END + str(
         permitted_residues) + color.BOLD + "\tAtoms:" + color.END + str(permitted_atoms))
-    return permitted_models, permitted_chains, permitted_residues, permitted_atoms
+    # returned as sets, they are only used for membership tests while parsing
+    return set(permitted_models), set(permitted_chains), set(permitted_residues), set(permitted_atoms)
 
 
 def gen_chain_name(i):
@@ -450,103 +444,102 @@ def read_coordinates(pdb_file, args):  # reading coordinates from PDB file
     debug = args['debug']
     permitted_models, permitted_chains, permitted_residues, permitted_atoms = parse_atoms(
         args)  # decide, which models/chains/residues/atoms to store
-    with open(args['input_file'], 'r') as input_file:
-        if type(debug) is list: print(time.strftime("%d %b %H:%M:%S", time.gmtime()) + " File " + args[
-            'input_file'] + " opened. Reading the coordinates.")
-        ###                     # initial values for model
-        current_model = 1
-        store = False
-        model_cleaned = True
-        model_created = True
-        if current_model in permitted_models or '*' in permitted_models:
-            pdb_file.create_model(current_model)
-            store = True
-            if type(debug) is list: print(
-                        time.strftime("%d %b %H:%M:%S", time.gmtime()) + color.GREEN + " Found model " + str(
-                    current_model) + color.END)
-        ###                     # if we have to generate the chain names
-        current_chain = 1
-        last_index = -99999
-        result = ''
-        ###
-        for line in input_file:
-            if line[0:6] == "MODEL ":
-                if not model_cleaned and store:
-                    pdb_file.clean(current_model, args['altloc'], permitted_atoms, permitted_residues)
-                    result += str(print_coordinates(pdb_file, current_model, args))
-                    model_cleaned = True
-                current_model = int(line[10:14].strip())
-                if (current_model in permitted_models or '*' in permitted_models):
+    if type(debug) is list: print(time.strftime("%d %b %H:%M:%S", time.gmtime()) + " File " + args[
+        'input_file'] + " opened. Reading the coordinates.")
+    ###                     # initial values for model
+    current_model = 1
+    store = False
+    model_cleaned = True
+    model_created = True
+    if current_model in permitted_models or '*' in permitted_models:
+        pdb_file.create_model(current_model)
+        store = True
+        if type(debug) is list: print(
+                    time.strftime("%d %b %H:%M:%S", time.gmtime()) + color.GREEN + " Found model " + str(
+                current_model) + color.END)
+    ###                     # if we have to generate the chain names
+    current_chain = 1
+    last_index = -99999
+    result = ''
+    ###
+    for line in pdb_file.records:  # coordinate records stored by scan_pdb, the file is not opened again
+        if line[0:6] == "MODEL ":
+            if not model_cleaned and store:
+                pdb_file.clean(current_model, args['altloc'], permitted_atoms, permitted_residues)
+                result += str(print_coordinates(pdb_file, current_model, args))
+                model_cleaned = True
+            current_model = int(line[10:14].strip())
+            if (current_model in permitted_models or '*' in permitted_models):
+                store = True
+                if current_model > 1:
+                    pdb_file.create_model(current_model)
+                    current_chain = 1
+                    if type(debug) is list: print(time.strftime("%d %b %H:%M:%S",
+                                                                time.gmtime()) + color.GREEN + " Found model " + str(
+                        current_model) + color.END)
+            else:
+                store = False
+            model_created = True
+        if current_model > 1 and args['bridges']: break
+        if line[0:6] == "ENDMDL" and store:
+            if not model_cleaned and store:
+                pdb_file.clean(current_model, args['altloc'], permitted_atoms,
+                               permitted_residues)  # cleaning the data
+                result += str(print_coordinates(pdb_file, current_model, args))
+                model_cleaned = True
+                model_created = False
+            if args['extended']: break
+        if line[0:6] == "ATOM  ":
+            if not model_created:
+                current_model += 1
+                if current_model in permitted_models or '*' in permitted_models:
+                    pdb_file.create_model(current_model)
+                    current_chain = 1
+                    store = True
+                    if type(debug) is list and current_model > 1: print(time.strftime("%d %b %H:%M:%S",
+                                                                                      time.gmtime()) + color.GREEN + " Found model " + str(
+                        current_model) + color.END)
+                else:
+                    store = False
+                model_created = True
+                if type(debug) is list: print(
+                            time.strftime("%d %b %H:%M:%S", time.gmtime()) + color.GREEN + " Found model " + str(
+                        current_model) + color.END)
+            if line[21] == ' ':  # if there is no chain ID but the resID drops down
+                if int(line[22:26]) < last_index: current_chain += 1
+            last_index = int(line[22:26])
+            if store: pdb_file.models['mod' + str(current_model)].add_atom(line, current_chain, permitted_chains,
+                                                                           permitted_residues, permitted_atoms)
+            if model_cleaned: model_cleaned = False
+        if line[0:6] == "HETATM":
+            if not model_created:
+                current_model += 1
+                if current_model in permitted_models or '*' in permitted_models:
+                    pdb_file.create_model(current_model)
+                    current_chain = 1
                     store = True
-                    if current_model > 1:
-                        pdb_file.create_model(current_model)
-                        current_chain = 1
-                        if type(debug) is list: print(time.strftime("%d %b %H:%M:%S",
-                                                                    time.gmtime()) + color.GREEN + " Found model " + str(
-                            current_model) + color.END)
+                    if type(debug) is list and current_model > 1: print(time.strftime("%d %b %H:%M:%S",
+                                                                                      time.gmtime()) + color.GREEN + " Found model " + str(
+                        current_model) + color.END)
                 else:
                     store = False
                 model_created = True
-            if current_model > 1 and args['bridges']: break
-            if line[0:6] == "ENDMDL" and store:
-                if not model_cleaned and store:
-                    pdb_file.clean(current_model, args['altloc'], permitted_atoms,
-                                   permitted_residues)  # cleaning the data
-                    result += str(print_coordinates(pdb_file, current_model, args))
-                    model_cleaned = True
-                    model_created = False
-                if args['extended']: break
-            if line[0:6] == "ATOM  ":
-                if not model_created:
-                    current_model += 1
-                    if current_model in permitted_models or '*' in permitted_models:
-                        pdb_file.create_model(current_model)
-                        current_chain = 1
-                        store = True
-                        if type(debug) is list and current_model > 1: print(time.strftime("%d %b %H:%M:%S",
-                                                                                          time.gmtime()) + color.GREEN + " Found model " + str(
-                            current_model) + color.END)
-                    else:
-                        store = False
-                    model_created = True
-                    if type(debug) is list: print(
-                                time.strftime("%d %b %H:%M:%S", time.gmtime()) + color.GREEN + " Found model " + str(
-                            current_model) + color.END)
-                if line[21] == ' ':  # if there is no chain ID but the resID drops down
-                    if int(line[22:26]) < last_index: current_chain += 1
-                last_index = int(line[22:26])
-                if store: pdb_file.models['mod' + str(current_model)].add_atom(line, current_chain, permitted_chains,
-                                                                               permitted_residues, permitted_atoms)
-                if model_cleaned: model_cleaned = False
-            if line[0:6] == "HETATM":
-                if not model_created:
-                    current_model += 1
-                    if current_model in permitted_models or '*' in permitted_models:
-                        pdb_file.create_model(current_model)
-                        current_chain = 1
-                        store = True
-                        if type(debug) is list and current_model > 1: print(time.strftime("%d %b %H:%M:%S",
-                                                                                          time.gmtime()) + color.GREEN + " Found model " + str(
-                            current_model) + color.END)
-                    else:
-                        store = False
-                    model_created = True
-                    if type(debug) is list: print(
-                                time.strftime("%d %b %H:%M:%S", time.gmtime()) + color.GREEN + " Found model " + str(
-                            current_model) + color.END)
-                if line[21] == ' ':  # if there is no chain ID but the resID drops
-                    if int(line[22:26]) < last_index: current_chain += 1
-                last_index = int(line[22:26])
-                if store: pdb_file.models['mod' + str(current_model)].add_atom(line, current_chain, permitted_chains,
-                                                                               permitted_residues, permitted_atoms)
-                if model_cleaned: model_cleaned = False
-            if line[0:6] == "TER   ": current_chain += 1
-            if line[0:6] == "END   ":
-                if not model_cleaned and store:
-                    pdb_file.clean(current_model, args['altloc'], permitted_atoms,
-                                   permitted_residues)  # cleaning the data
-                    result += str(print_coordinates(pdb_file, current_model, args))
-                    model_cleaned = True
+                if type(debug) is list: print(
+                            time.strftime("%d %b %H:%M:%S", time.gmtime()) + color.GREEN + " Found model " + str(
+                        current_model) + color.END)
+            if line[21] == ' ':  # if there is no chain ID but the resID drops
+                if int(line[22:26]) < last_index: current_chain += 1
+            last_index = int(line[22:26])
+            if store: pdb_file.models['mod' + str(current_model)].add_atom(line, current_chain, permitted_chains,
+                                                                           permitted_residues, permitted_atoms)
+            if model_cleaned: model_cleaned = False
+        if line[0:6] == "TER   ": current_chain += 1
+        if line[0:6] == "END   ":
+            if not model_cleaned and store:
+                pdb_file.clean(current_model, args['altloc'], permitted_atoms,
+                               permitted_residues)  # cleaning the data
+                result += str(print_coordinates(pdb_file, current_model, args))
+                model_cleaned = True
     #    if line[0:6] == "ANISOU": pdb_file.add_dbref(line)
     #    if line[0:6] == "CONECT": pdb_file.add_dbref(line)
     #    if line[0:6] == "MASTER": pdb_file.add_dbref(line)
@@ -922,6 +915,38 @@ def print_commands(PDB, args):  # printing commands for Wanda's program
     return
 
 
+def print_lassos(PDB, args):  # printing lasso classification of all loops closed by intra-chain bridges
+    if type(args['debug']) is list: print(time.strftime("%d %b %H:%M:%S",
+                                                        time.gmtime()) + color.CYAN + " Classifying lassos" + color.END)
+    loops = {}  # chain name -> list of bridges, the same as in print_commands
+    for bridge in PDB.bridge_list:
+        if bridge not in PDB.cross_bridge_list and PDB.bridges[bridge].peptide and PDB.bridges[
+            bridge].size >= min_loop_length:
+            loops.setdefault(PDB.bridges[bridge].res1_chain, []).append(PDB.bridges[bridge])
+    result = 'bridge chain res1 res2 whN maxN minN clN whC maxC minC clC\n'
+    for chain_name in loops:
+        chain = PDB.find_chain(0, chain_name)
+        coordinates = chain.xyz_coordinates()  # the points of the .xyz file, so GLN is the same as from GLNtoPNG.py
+        bridges = [bridge for bridge in loops[chain_name] if
+                   0 <= bridge.res1_index - chain.NEnd_number < len(coordinates) and
+                   0 <= bridge.res2_index - chain.NEnd_number < len(coordinates)]
+        lassos = gln.lassos(coordinates, [(bridge.res1_index - chain.NEnd_number, bridge.res2_index - chain.NEnd_number)
+                                          for bridge in bridges])
+        for bridge, tails in zip(bridges, lassos):
+            result += bridge.type + ' ' + chain_name + ' ' + str(bridge.res1_index) + ' ' + str(bridge.res2_index)
+            for tail in tails:
+                if type(tail) == str:
+                    result += ' ' + tail + ' - - -'
+                else:
+                    result += ' ' + ' '.join([str(tail['wh']), str(tail['max']), str(tail['min']), tail['cl']])
+            result += '\n'
+    result = result[:-1]
+    if args['output'][0] == 'pipe':
+        return result
+    print(result)
+    return
+
+
 def print_cross_bridges(PDB, args):  # printing cross-chain bridges to screen to screen
     if type(args['debug']) is list: print(time.strftime("%d %b %H:%M:%S",
                                                         time.gmtime()) + color.CYAN + " Printing cross-chains bridges" + color.END)
@@ -1492,6 +1517,7 @@ class PDB_File:
         self.bridge_list = []
         self.bridges = {}
         self.bridges_cleaned = False
+        self.bridge_index = {}
         self.general_chain_list = []
         self.general_chains = {}
         self.missing_residue_models = []
@@ -1501,6 +1527,13 @@ class PDB_File:
         self.cross_bridges_number = 0
         self.cross_bridge_list = []
         self.created_PDB = []
+        self.records = []  # coordinate records collected by scan_pdb
+        self.atom_store = Atom_store()
+        self.model_records = 0
+        self.ssbond = False
+        self.link = False
+        self.chain_names = []
+        self.termini = {}
 
     #### Adding part
     def add_header(self, line):
@@ -1578,6 +1611,10 @@ class PDB_File:
         self.model_number = int(line[10:14].strip())
 
     def add_bond(self, line):
+        if line[0:6] == 'SSBOND':
+            self.ssbond = True
+        else:
+            self.link = True
         number = len(self.bridge_list)
         self.bridges['bridge' + str(number)] = Bridge(number, line)
         self.bridge_list.append('bridge' + str(number))
@@ -1628,7 +1665,7 @@ class PDB_File:
 
     def create_model(self, current_model):
         if current_model > self.model_number: self.model_number = current_model
-        self.models['mod' + str(current_model)] = Model(current_model, len(self.models))
+        self.models['mod' + str(current_model)] = Model(current_model, len(self.models), self.atom_store)
         self.model_list.append('mod' + str(current_model))
 
     def add_residue(self, line):
@@ -1637,6 +1674,18 @@ class PDB_File:
             self.general_chains[line[11]] = General_chain(line[11])
         self.general_chains[line[11]].add_residue(line)
 
+    def add_record(self, line, keep=True):
+        if keep: self.records.append(line)
+        if line[0:6] == 'MODEL ':
+            self.model_records += 1
+        elif line[0:6] == 'ATOM  ' and self.model_records <= 1:  # chains and termini are taken from the first model
+            chain = line[21]
+            if chain not in self.termini:
+                self.chain_names.append(chain)
+                self.termini[chain] = [int(line[22:26]), int(line[22:26])]
+            else:
+                self.termini[chain][1] = int(line[22:26])
+
     def add_ends(self):
         for f in self.created_PDB:
             with open(f, 'a') as myfile:
@@ -1656,6 +1705,9 @@ class PDB_File:
         if model == 0: return self.models[self.model_list[0]].chains[chain]
         return self.models['mod' + str(model)].chains[chain]
 
+    def find_bridge(self, chain, res1, res2):  # bridge joining two residues of the chain, None if there is none
+        return self.bridge_index.get(frozenset(((chain, res1), (chain, res2))))
+
     def find_missing_residue(self, model, chain, residue_name):
         if not chain in self.general_chain_list: return 'UNK'
         g_chain = self.general_chains[chain]
@@ -1702,24 +1754,29 @@ class PDB_File:
         self.cross_bridges_number = number
         return
 
-    def remove_duplicated_bridges(self):
-        k = 0
-        while k < len(self.bridge_list):
-            l = k + 1
-            while l < len(self.bridge_list):
-                bridge1 = self.bridges[self.bridge_list[k]]
-                bridge2 = self.bridges[self.bridge_list[l]]
-                if set([bridge1.res1_index, bridge1.res2_index]) == set(
-                        [bridge2.res1_index, bridge2.res2_index]) and set(
-                        [bridge1.res1_chain, bridge1.res2_chain]) == set([bridge2.res1_chain, bridge2.res2_chain]):
-                    self.bridge_list.pop(l)
-                    l -= 1
-                l += 1
-            k += 1
+    def index_bridges(self):  # unordered pair of (chain, residue) ends -> bridge, for all bridges but "OTHER"
+        self.bridge_index = {}
+        for name in self.bridge_list:
+            bridge = self.bridges[name]
+            if bridge.type != 'OTHER':
+                self.bridge_index.setdefault(frozenset(((bridge.res1_chain, bridge.res1_index),
+                                                        (bridge.res2_chain, bridge.res2_index))), name)
+
+    def remove_duplicated_bridges(self):  # keeping the first bridge between each pair of (chain, residue) ends
+        ends = set()
+        bridge_list = []
+        for name in self.bridge_list:
+            bridge = self.bridges[name]
+            key = frozenset(((bridge.res1_chain, bridge.res1_index), (bridge.res2_chain, bridge.res2_index)))
+            if key not in ends:
+                ends.add(key)
+                bridge_list.append(name)
+        self.bridge_list = bridge_list
 
     def clean(self, current_model, altloc, atoms, residues):
         if not self.bridges_cleaned:
             self.remove_duplicated_bridges()
+            self.index_bridges()
             self.calculate_cross_bridges_number()
             for l in range(len(self.bridge_list)):
                 self.bridges[self.bridge_list[l]].clean(self)
@@ -1730,6 +1787,10 @@ class PDB_File:
         self.find_total_atom_number(current_model)
         return
 
+    def metadata(self):  # models counts the MODEL records, 0 for a file with a single implicit model
+        return {'models': self.model_records, 'nmr': any('SOLUTION NMR' in method for method in self.expmethod),
+                'ssbond': self.ssbond, 'link': self.link, 'chains': self.chain_names, 'termini': self.termini}
+
     #### Printing part
     def informations(self, debug):
         if type(debug) is list and (
@@ -1769,10 +1830,14 @@ class PDB_File:
 
 #### Model
 class Model:
-    def __init__(self, number, index):
+    __slots__ = ['number', 'name', 'index', 'store', 'chains', 'chain_list', 'total_chain_number', 'total_res_number',
+                 'total_atom_number', 'time']
+
+    def __init__(self, number, index, store):
         self.number = number
         self.name = 'mod' + str(number)
         self.index = index
+        self.store = store
         self.chains = {}
         self.chain_list = []
         self.total_chain_number = 0
@@ -1786,9 +1851,9 @@ class Model:
         chain_name = line[21]
         if chain_name == ' ': chain_name = gen_chain_name(current_chain)
         if chain_name in chains or '*' in chains or str(self.number) + '_' + chain_name in chains:
-            if chain_name not in self.chain_list:
+            if chain_name not in self.chains:
                 self.chain_list.append(chain_name)
-                self.chains[chain_name] = Chain(chain_name, self.number, self.index, len(self.chains))
+                self.chains[chain_name] = Chain(chain_name, self.number, self.index, len(self.chains), self.store)
             self.chains[chain_name].add_atom(line, residues, atoms)
 
     #### Cleaning part
@@ -1866,11 +1931,16 @@ class Model:
 
 #### Chain
 class Chain:
-    def __init__(self, name, model, model_index, index):
+    __slots__ = ['name', 'model', 'model_index', 'index', 'store', 'residues', 'residue_list', 'residue_list_sorted',
+                 'residue_missing_list', 'residue_hetatom_list', 'residue_nonpeptide_list', 'total_atom_number',
+                 'total_res_number', 'warning', 'NEnd', 'CEnd', 'NEnd_number', 'CEnd_number', 'com', 'R']
+
+    def __init__(self, name, model, model_index, index, store):
         self.name = name
         self.model = model
         self.model_index = model_index
         self.index = index
+        self.store = store
         self.residues = {}
         self.residue_list = []
         self.residue_list_sorted = []
@@ -1891,17 +1961,15 @@ class Chain:
     def add_atom(self, line, residues, atoms):
         residue_index = int(line[22:26])
         if residue_index in residues or '*' in residues or line[0:6] == 'HETATM':
-            if residue_index not in self.residue_list:
+            if residue_index not in self.residues:
                 self.residue_list.append(residue_index)
-                self.residues[residue_index] = Residue(line, self.name, self.model)
+                self.residues[residue_index] = Residue(line, self.name, self.model, self.store)
             self.residues[residue_index].add_atom(line, atoms)
         return None
 
     #### Analysis
     def distance(self, res1, res2):
-        coord1 = res1.atoms[res1.atom_list[res1.main]].coordinates
-        coord2 = res2.atoms[res2.atom_list[res2.main]].coordinates
-        return dist(coord1, coord2)
+        return sqrt(((res1.main_atom().xyz - res2.main_atom().xyz) ** 2).sum())
 
     #### Cleaning part
     def clean(self, pdb_file, altloc, atoms):
@@ -1918,19 +1986,19 @@ class Chain:
         self.find_R()
         if self.warning: print(self.warning)  #### todo to poprawic
 
+    def main_coordinates(self):  # coordinates of main atoms of the sorted residues, as an (N, 3) array
+        return self.store.table('xyz')[[self.residues[res].main_atom().row for res in self.residue_list_sorted]]
+
+    def xyz_coordinates(self):  # coordinates of the atoms written by print_xyz (without hetatoms), as an (N, 3) array;
+        # the k-th of them has the index NEnd_number + k in the .xyz file
+        return self.store.table('xyz')[[self.residues[res].atoms[atom].row for res in self.residue_list_sorted
+                                        for atom in self.residues[res].atom_list_sorted]]
+
     def find_com(self):
-        com = self.com
-        for res in self.residue_list_sorted:
-            atom = self.residues[res].atoms[self.residues[res].atom_list[self.residues[res].main]]
-            com = [x + float(y) for x, y in zip(com, atom.coordinates)]
-        self.com = [x / len(self.residue_list_sorted) for x in com]
+        self.com = [float(x) for x in self.main_coordinates().sum(axis=0) / len(self.residue_list_sorted)]
 
     def find_R(self):
-        sumR = 0
-        for res in self.residue_list_sorted:
-            atom = self.residues[res].atoms[self.residues[res].atom_list[self.residues[res].main]]
-            sumR += sum([(x - float(y)) ** 2 for x, y in zip(self.com, atom.coordinates)])
-        self.R = sqrt(sumR / len(self.residue_list_sorted))
+        self.R = sqrt(((self.main_coordinates() - self.com) ** 2).sum() / len(self.residue_list_sorted))
 
     def extract_hetatoms(self):
         for k in range(len(self.residue_list)):
@@ -1971,22 +2039,14 @@ class Chain:
                         self.residue_list_sorted.append(
                             self.residue_list[k])  # add it and make it "peptide" = main chain
                         self.residues[self.residue_list_sorted[-1]].peptide = True
-                    else:  # so the case which is left is hetatom residue, which is not "normal"
-                        for l in range(
-                                len(pdb_file.bridge_list)):  # for example MSE. These should be connected via "LINK" line
-                            chain1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_chain
-                            chain2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_chain
-                            res1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_index
-                            res2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_index
-                            index1 = int(self.residues[self.residue_list[k]].name)
-                            index2 = int(self.residues[self.residue_list[k + 1]].name)
-                            if (chain1, chain2) == (self.name, self.name) and set((res1, res2)) == set(
-                                    (index1, index2)) and pdb_file.bridges[
-                                pdb_file.bridge_list[l]].type != 'OTHER':  # we accept all bridges but "OTHER"
-                                self.residue_list_sorted.append(
-                                    self.residue_list[k])  # if the bridge connect the residue and the next one,
-                                self.residues[self.residue_list_sorted[-1]].peptide = True  # we add it to the list
-                                self.residue_hetatom_list.append(self.residue_list[k])
+                    elif k + 1 < len(self.residue_list):  # so the case which is left is hetatom residue, which is
+                        index1 = self.residues[self.residue_list[k]].name  # not "normal", for example MSE. These
+                        index2 = self.residues[self.residue_list[k + 1]].name  # should be connected via "LINK" line
+                        if pdb_file.find_bridge(self.name, index1, index2):  # we accept all bridges but "OTHER"
+                            self.residue_list_sorted.append(
+                                self.residue_list[k])  # if the bridge connect the residue and the next one,
+                            self.residues[self.residue_list_sorted[-1]].peptide = True  # we add it to the list
+                            self.residue_hetatom_list.append(self.residue_list[k])
                 k += 1
             for l in range(k, len(self.residue_list)):
                 if len(self.residues[self.residue_list[
@@ -2016,18 +2076,17 @@ class Chain:
                     self.residues[self.residue_list[k]].name) + '.\n'
                 res1 = pdb_file.find_residue(self.model, self.name, self.residue_list_sorted[-1])
                 res2 = pdb_file.find_residue(self.model, self.name, self.residue_list[k])
-                coordinates1 = res1.atoms[res1.atom_list[res1.main]].coordinates
-                coordinates2 = res2.atoms[res2.atom_list[res2.main]].coordinates
-                delta = [(float(b_i) - float(a_i)) / n for a_i, b_i in zip(coordinates1, coordinates2)]
+                coordinates1 = res1.main_atom().xyz
+                delta = (res2.main_atom().xyz - coordinates1) / n
                 n0 = int(self.residues[self.residue_list_sorted[-1]].name)
                 for j in range(1, n):
                     residue = pdb_file.find_missing_residue(self.model, self.name, n0 + j)
                     line = "ATOM  %(atom)5s  CA  %(resname)3s %(chain)1s%(res_nr)4s    %(x)8s%(y)8s%(z)8s  1.00  1.00           C  \n" % {
                         "atom": 1, "resname": residue, "chain": self.name, "res_nr": j + n0,
-                        "x": '{0:.3f}'.format(float(coordinates1[0]) + j * delta[0], 3),
-                        "y": '{0:.3f}'.format(float(coordinates1[1]) + j * delta[1], 3),
-                        "z": '{0:.3f}'.format(float(coordinates1[2]) + j * delta[2], 3)}
-                    self.residues[n0 + j] = Residue(line, self.name, self.model)
+                        "x": '{0:.3f}'.format(coordinates1[0] + j * delta[0], 3),
+                        "y": '{0:.3f}'.format(coordinates1[1] + j * delta[1], 3),
+                        "z": '{0:.3f}'.format(coordinates1[2] + j * delta[2], 3)}
+                    self.residues[n0 + j] = Residue(line, self.name, self.model, self.store)
                     self.residues[self.residue_list_sorted[-1]].CEnd = False
                     self.residue_list_sorted.append(n0 + j)
                     self.residues[self.residue_list_sorted[-1]].NEnd = False
@@ -2040,18 +2099,8 @@ class Chain:
                 self.residues[self.residue_list_sorted[-1]].NEnd = False
             if n == 1 and (
                     self.residues[self.residue_list_sorted[-1]].hetatom or self.residues[self.residue_list[k]].hetatom):
-                bridge_exists = False
-                for l in range(len(pdb_file.bridge_list)):
-                    chain1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_chain
-                    chain2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_chain
-                    res1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_index
-                    res2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_index
-                    index1 = int(self.residues[self.residue_list_sorted[-1]].name)
-                    index2 = int(self.residues[self.residue_list[k]].name)
-                    if (chain1, chain2) == (self.name, self.name) and set((res1, res2)) == set((index1, index2)) and \
-                            pdb_file.bridges[pdb_file.bridge_list[l]].type != 'OTHER':
-                        bridge_exists = True
-                        break
+                bridge_exists = bool(pdb_file.find_bridge(self.name, self.residues[self.residue_list_sorted[-1]].name,
+                                                          self.residues[self.residue_list[k]].name))
                 if bridge_exists:
                     d = self.distance(self.residues[self.residue_list_sorted[-1]], self.residues[self.residue_list[k]])
                     if (d < 2.0): self.warning += 'WARNING!!! Unnatural distance ' + str(
@@ -2068,18 +2117,8 @@ class Chain:
                     self.residues[self.residue_list_sorted[-1]].peptide = True
             if n > 1 and (self.residues[self.residue_list_sorted[-1]].hetatom and not self.residues[
                 self.residue_list[k]].hetatom):
-                bridge_exists = False
-                for l in range(len(pdb_file.bridge_list)):
-                    chain1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_chain
-                    chain2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_chain
-                    res1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_index
-                    res2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_index
-                    index1 = int(self.residues[self.residue_list_sorted[-1]].name)
-                    index2 = int(self.residues[self.residue_list[k]].name)
-                    if (chain1, chain2) == (self.name, self.name) and set((res1, res2)) == set((index1, index2)) and \
-                            pdb_file.bridges[pdb_file.bridge_list[l]].type != 'OTHER':
-                        bridge_exists = True
-                        break
+                bridge_exists = bool(pdb_file.find_bridge(self.name, self.residues[self.residue_list_sorted[-1]].name,
+                                                          self.residues[self.residue_list[k]].name))
                 if bridge_exists:
                     self.residues[self.residue_list_sorted[-1]].CEnd = False
                     self.residue_list_sorted.append(self.residue_list[k])
@@ -2088,18 +2127,17 @@ class Chain:
                 else:
                     res1 = pdb_file.find_residue(self.model, self.name, self.residue_list_sorted[-1])
                     res2 = pdb_file.find_residue(self.model, self.name, self.residue_list[k])
-                    coordinates1 = res1.atoms[res1.atom_list[res1.main]].coordinates
-                    coordinates2 = res2.atoms[res2.atom_list[res2.main]].coordinates
-                    delta = [(float(b_i) - float(a_i)) / n for a_i, b_i in zip(coordinates1, coordinates2)]
+                    coordinates1 = res1.main_atom().xyz
+                    delta = (res2.main_atom().xyz - coordinates1) / n
                     n0 = int(self.residues[self.residue_list_sorted[-1]].name)
                     for j in range(1, n):
                         residue = pdb_file.find_missing_residue(self.model, self.name, n0 + j)
                         line = "ATOM  %(atom)5s  CA  %(resname)3s %(chain)1s%(res_nr)4s    %(x)8s%(y)8s%(z)8s  1.00  1.00           C  \n" % {
                             "atom": 1, "resname": residue, "chain": self.name, "res_nr": j + n0,
-                            "x": '{0:.3f}'.format(float(coordinates1[0]) + j * delta[0], 3),
-                            "y": '{0:.3f}'.format(float(coordinates1[1]) + j * delta[1], 3),
-                            "z": '{0:.3f}'.format(float(coordinates1[2]) + j * delta[2], 3)}
-                        self.residues[n0 + j] = Residue(line, self.name, self.model)
+                            "x": '{0:.3f}'.format(coordinates1[0] + j * delta[0], 3),
+                            "y": '{0:.3f}'.format(coordinates1[1] + j * delta[1], 3),
+                            "z": '{0:.3f}'.format(coordinates1[2] + j * delta[2], 3)}
+                        self.residues[n0 + j] = Residue(line, self.name, self.model, self.store)
                         self.residues[self.residue_list_sorted[-1]].CEnd = False
                         self.residue_list_sorted.append(n0 + j)
                         self.residues[self.residue_list_sorted[-1]].NEnd = False
@@ -2112,18 +2150,8 @@ class Chain:
                     self.residues[self.residue_list_sorted[-1]].peptide = True
 
             if n > 1 and self.residues[self.residue_list[k]].hetatom:
-                bridge_exists = False
-                for l in range(len(pdb_file.bridge_list)):
-                    chain1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_chain
-                    chain2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_chain
-                    res1 = pdb_file.bridges[pdb_file.bridge_list[l]].res1_index
-                    res2 = pdb_file.bridges[pdb_file.bridge_list[l]].res2_index
-                    index1 = int(self.residues[self.residue_list_sorted[-1]].name)
-                    index2 = int(self.residues[self.residue_list[k]].name)
-                    if (chain1, chain2) == (self.name, self.name) and set((res1, res2)) == set((index1, index2)) and \
-                            pdb_file.bridges[pdb_file.bridge_list[l]].type != 'OTHER':
-                        bridge_exists = True
-                        break
+                bridge_exists = bool(pdb_file.find_bridge(self.name, self.residues[self.residue_list_sorted[-1]].name,
+                                                          self.residues[self.residue_list[k]].name))
                 if bridge_exists:
                     self.residues[self.residue_list_sorted[-1]].CEnd = False
                     self.residue_list_sorted.append(self.residue_list[k])
@@ -2274,10 +2302,14 @@ class General_chain:
 
 #### Residue
 class Residue:
-    def __init__(self, line, chain, model):
+    __slots__ = ['name', 'chain', 'model', 'store', 'type', 'atoms', 'atom_list', 'atom_list_sorted',
+                 'total_atom_number', 'missing', 'peptide', 'main', 'CEnd', 'NEnd', 'standard', 'hetatom']
+
+    def __init__(self, line, chain, model, store):
         self.name = int(line[22:26])
         self.chain = chain
         self.model = model
+        self.store = store
         self.type = line[17:20].strip()
         if self.type in amino_acids + nucleotides:
             self.standard = True
@@ -2299,7 +2331,8 @@ class Residue:
     def add_atom(self, line, atoms):
         if line[12:16].strip() in atoms or '*' in atoms or line[0:6] == 'HETATM':
             self.atom_list.append(line[12:16].strip() + line[16].strip())
-            self.atoms[line[12:16].strip() + line[16].strip()] = Atom(line, self.name, self.chain, self.model)
+            self.atoms[line[12:16].strip() + line[16].strip()] = Atom(self.store, self.store.add(line, self.name,
+                                                                                               self.chain, self.model))
 
     #### Cleaning part
     def clean(self, altloc):
@@ -2315,35 +2348,18 @@ class Residue:
         if len(self.atoms) == 0:
             self.peptide = False
             return
-        for k in range(len(self.atom_list)):
-            if self.atoms[self.atom_list[k]].name.strip() == 'CA' and self.atoms[
-                self.atom_list[k]].altloc.strip() == altloc:
-                self.main = k
-                break
-            if self.atoms[self.atom_list[k]].name.strip() == 'CA' and self.atoms[
-                self.atom_list[k]].altloc.strip() == '':
-                self.main = k
-                break
-            if self.atoms[self.atom_list[k]].name.strip() == 'CA':
-                self.main = k
-                break
-            if self.atoms[self.atom_list[k]].name.strip() == "C3'" and self.atoms[
-                self.atom_list[k]].altloc.strip() == altloc:
-                self.main = k
-                break
-            if self.atoms[self.atom_list[k]].name.strip() == "C3'" and self.atoms[
-                self.atom_list[k]].altloc.strip() == '':
-                self.main = k
-                break
-            if self.atoms[self.atom_list[k]].name.strip() == "C3'":
+        names = self.store.texts(self.rows(), 'name')
+        for k in range(len(names)):
+            if names[k].strip() == 'CA' or names[k].strip() == "C3'":  # the first CA or C3', whatever its altloc
                 self.main = k
                 break
         self.atoms[self.atom_list[self.main]].main = True
 
     def clean_atom_list(self, altloc):
-        for atom in self.atom_list:
-            if self.atoms[atom].altloc.strip() == '' or self.atoms[atom].altloc.strip() == altloc or self.atoms[
-                atom].main:
+        altlocs = self.store.texts(self.rows(), 'altloc')
+        mains = self.store.table('main')[self.rows()].tolist()
+        for k, atom in enumerate(self.atom_list):
+            if altlocs[k] == '' or altlocs[k] == altloc or mains[k]:
                 if not self.hetatom: self.atom_list_sorted.append(atom)
                 if self.hetatom:  # for hetatoms we add only the first atom
                     self.atom_list_sorted.append(atom)
@@ -2365,8 +2381,14 @@ class Residue:
             result += self.atoms[self.atom_list_sorted[k]].print_xyz(atom_starting_index + k, four, column_format)
         return result
 
+    def rows(self):  # rows of the atom store holding the atoms of the residue
+        return [self.atoms[atom].row for atom in self.atom_list]
+
+    def main_atom(self):
+        return self.atoms[self.atom_list[self.main]]
+
     def print_point_coordinates(self):
-        return self.atoms[self.atom_list[self.main]].coordinates
+        return self.main_atom().coordinates
 
     def print_residue_info(self, debug):
         print(color.BOLD + "\t\t\tResidue name:\t" + color.END + str(self.name))
@@ -2393,35 +2415,131 @@ class Residue:
         print("\t\t\t________________________________\n")
 
 
+#### Atom store
+class Atom_store:  # columnar storage of all atoms read from the file; Atom objects are views on its rows
+    text_columns = ['name', 'altloc', 'resname', 'insertion', 'occupancy', 'bFactor', 'element', 'charge', 'chain']
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.pending = []  # rows added since the last flush, moved to the arrays at once
+        self.xyz = np.zeros((capacity, 3))
+        self.serial = np.zeros(capacity, dtype=np.int32)
+        self.residue = np.zeros(capacity, dtype=np.int32)
+        self.model = np.zeros(capacity, dtype=np.int32)
+        self.main = np.zeros(capacity, dtype=bool)
+        self.codes = np.zeros((capacity, len(self.text_columns)), dtype=np.int32)  # categorical text columns
+        self.index = [{} for column in self.text_columns]  # text -> code, per column
+        self.values = [[] for column in self.text_columns]  # code -> text, per column
+
+    def add(self, line, residue, chain, model):  # storing ATOM/HETATM line, returns the row of the atom
+        self.pending.append((line, residue, chain, model))
+        self.size += 1
+        return self.size - 1
+
+    def flush(self):  # parsing the pending lines column by column
+        start = self.size - len(self.pending)
+        if self.size > len(self.xyz):
+            capacity = max(self.size, 2 * len(self.xyz))
+            for column in ['xyz', 'serial', 'residue', 'model', 'main', 'codes']:
+                old = getattr(self, column)
+                new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                new[:start] = old[:start]
+                setattr(self, column, new)
+        lines = [atom[0] for atom in self.pending]
+        self.xyz[start:self.size] = np.array([[line[30:38], line[38:46], line[46:54]] for line in lines], dtype=float)
+        self.serial[start:self.size] = np.array([line[6:11] for line in lines], dtype=int)
+        self.residue[start:self.size] = [atom[1] for atom in self.pending]
+        self.model[start:self.size] = [atom[3] for atom in self.pending]
+        columns = [[line[12:16] for line in lines], [line[16].strip() for line in lines],
+                 [line[17:20].strip() for line in lines], [line[26].strip() for line in lines],
+                 [line[54:60].strip() for line in lines], [line[60:66].strip() for line in lines],
+                 [line[76:78].strip() for line in lines], [line[78:80].strip() for line in lines],
+                 [atom[2] for atom in self.pending]]
+        for k, column in enumerate(columns):
+            unique, inverse = np.unique(np.array(column, dtype=str), return_inverse=True)
+            codes = [self.index[k].setdefault(text, len(self.index[k])) for text in unique.tolist()]
+            self.codes[start:self.size, k] = np.array(codes, dtype=np.int32)[inverse.reshape(-1)]
+        self.values = [list(index) for index in self.index]  # codes follow the order in which texts appeared
+        self.pending = []
+
+    def table(self, column):  # array of the column covering all atoms added so far
+        if self.pending: self.flush()
+        return getattr(self, column)
+
+    def text(self, row, k):
+        if self.pending: self.flush()
+        return self.values[k][self.codes[row, k]]
+
+    def record(self, row):  # all text columns, residue number and printed coordinates of the atom
+        if self.pending: self.flush()
+        codes = self.codes[row].tolist()
+        record = {column: self.values[k][codes[k]] for k, column in enumerate(self.text_columns)}
+        record['residue'] = int(self.residue[row])
+        record['x'], record['y'], record['z'] = self.coordinates(row)
+        return record
+
+    def texts(self, rows, column):  # one text column of many atoms
+        if self.pending: self.flush()
+        k = self.text_columns.index(column)
+        return [self.values[k][code] for code in self.codes[rows, k].tolist()]
+
+    def coordinates(self, row):  # coordinates as printed in PDB files
+        if self.pending: self.flush()
+        return ['%.3f' % x for x in self.xyz[row].tolist()]
+
+
 #### Atom
+def atom_text(column):  # property reading a text column of the atom store
+    k = Atom_store.text_columns.index(column)
+    return property(lambda self: self.store.text(self.row, k))
+
+
+def atom_number(column):  # property reading a numeric column of the atom store
+    return property(lambda self: int(self.store.table(column)[self.row]))
+
+
 class Atom:
-    def __init__(self, line, residue, chain, model):
-        self.name = line[12:16]
-        self.serial = int(line[6:11])
-        self.altloc = line[16].strip()
-        self.resname = line[17:20].strip()
-        self.insertion = line[26].strip()
-        self.coordinates = [line[30:38].strip(), line[38:46].strip(), line[46:54].strip()]
-        self.occupancy = line[54:60].strip()
-        self.bFactor = line[60:66].strip()
-        self.element = line[76:78].strip()
-        self.charge = line[78:80].strip()
-        self.residue = residue
-        self.chain = chain
-        self.model = model
-        self.connect = []
-        self.main = False
+    __slots__ = ['store', 'row']
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    name = atom_text('name')
+    altloc = atom_text('altloc')
+    resname = atom_text('resname')
+    insertion = atom_text('insertion')
+    occupancy = atom_text('occupancy')
+    bFactor = atom_text('bFactor')
+    element = atom_text('element')
+    charge = atom_text('charge')
+    chain = atom_text('chain')
+    serial = atom_number('serial')
+    residue = atom_number('residue')
+    model = atom_number('model')
+    xyz = property(lambda self: self.store.table('xyz')[self.row])
+    coordinates = property(lambda self: self.store.coordinates(self.row))
+
+    @property
+    def main(self):
+        return bool(self.store.table('main')[self.row])
+
+    @main.setter
+    def main(self, value):
+        self.store.table('main')[self.row] = value
 
     #### Cleaning part
     #### Printing part
     def print_pdb(self, atom_index, res_index):
+        atom = self.store.record(self.row)
         return "ATOM  %(atom)5s %(type)4s %(resname)3s %(chain)1s%(res_nr)4s    %(x)8s%(y)8s%(z)8s%(occupancy)6s%(bFactor)6s          %(element)2s%(charge)2s\n" % {
-            "atom": atom_index, "type": self.name, "resname": self.resname,
-            "chain": self.chain, "res_nr": self.residue, "x": self.coordinates[0],
-            "y": self.coordinates[1], "z": self.coordinates[2], "occupancy": self.occupancy,
-            "bFactor": self.bFactor, "element": self.element, "charge": self.charge}
+            "atom": atom_index, "type": atom['name'], "resname": atom['resname'],
+            "chain": atom['chain'], "res_nr": atom['residue'], "x": atom['x'],
+            "y": atom['y'], "z": atom['z'], "occupancy": atom['occupancy'],
+            "bFactor": atom['bFactor'], "element": atom['element'], "charge": atom['charge']}
 
     def print_xyz(self, res_index, four, column_format):
+        coordinates = self.coordinates
         if column_format:
             result = ''
             columns = ''
@@ -2430,9 +2548,9 @@ class Atom:
             for column in columns:
                 if column == '': continue
                 if column == 'index': result += str(self.residue) + " "
-                if column == 'x': result += str(self.coordinates[0]) + " "
-                if column == 'y': result += str(self.coordinates[1]) + " "
-                if column == 'z': result += str(self.coordinates[2]) + " "
+                if column == 'x': result += str(coordinates[0]) + " "
+                if column == 'y': result += str(coordinates[1]) + " "
+                if column == 'z': result += str(coordinates[2]) + " "
                 if column == 'chain': result += str(self.chain) + " "
                 if column == 'residue': result += str(self.resname) + " "
                 if column == 'model': result += str(self.model) + " "
@@ -2448,11 +2566,11 @@ class Atom:
             result += '\n'
             return result
         if four:
-            return str(res_index) + " " + str(self.coordinates[0]) + " " + str(self.coordinates[1]) + " " + str(
-                self.coordinates[2]) + "\n"
+            return str(res_index) + " " + str(coordinates[0]) + " " + str(coordinates[1]) + " " + str(
+                coordinates[2]) + "\n"
         else:
-            return str(res_index) + " " + str(self.coordinates[0]) + " " + str(self.coordinates[1]) + " " + str(
-                self.coordinates[2]) + " " + self.resname + "\n"
+            return str(res_index) + " " + str(coordinates[0]) + " " + str(coordinates[1]) + " " + str(
+                coordinates[2]) + " " + self.resname + "\n"
 
     def print_atom_info(self, debug):
         print(color.BOLD + "\t\t\t\tName:\t\t" + color.END + self.name.strip())
@@ -2545,6 +2663,11 @@ class Compound:
 
 #### Bridge
 class Bridge:
+    __slots__ = ['number', 'name', 'res1_NEnd', 'res1_CEnd', 'res2_NEnd', 'res2_CEnd', 'distance', 'res1_symop',
+                 'res2_symop', 'size', 'exists', 'peptide', 'serial', 'res1_index', 'res1_type', 'res1_chain',
+                 'res1_insert', 'res1_atom', 'res2_index', 'res2_type', 'res2_chain', 'res2_insert', 'res2_atom',
+                 'type', 'dist']
+
     #### Adding
     def __init__(self, number, line):
         self.number = number
@@ -2812,6 +2935,8 @@ if __name__ == "__main__":
                         help="Factor used in searching close chains used in link analysis.")
     parser.add_argument('--commands', nargs='*', dest="commands", default=['bridge_type'],
                         choices=['no', 'bridge_type', 'ready'], help="Commands format for Wanda lasso program.")
+    parser.add_argument('--lasso', action="store_true", dest="lasso", default=False,
+                        help="Classify lassos of all loops closed by intra-chain bridges instead of printing commands.")
     parser.add_argument('--noions', action="store_true", dest="noions", default=False,
                         help="If not to include the ions.")
     parser.add_argument('--closure', nargs=1, dest="closure", default=[], help="To close the protein and how.",
@@ -2828,13 +2953,18 @@ if __name__ == "__main__":
                         help=argparse.SUPPRESS)
     parser.add_argument('--version', action='version', version='%(prog)s 4.0')
     args = vars(parser.parse_args())
+    if args['lasso'] and gln is None:
+        print("Cannot import gln.py (GLN engine, needs NumPy) for --lasso! Exiting.")
+        sys.exit()
 
     PDB = PDB_File(args)
     read_header(PDB, args)  # reading header of PDB file
     informations(PDB, args)  # printing PDB info to screen
     if not (args['macro_ends'] or args['macro_close'] or args['xyz'] or args['extended']):
         read_coordinates(PDB, args)  # reading coordinates from PDB file and print selected
-        if not args['bridges'] and not args['sbridge'] and not args['schain']: print_commands(PDB,
+        if args['lasso'] and not args['bridges'] and not args['sbridge'] and not args['schain']:
+            print_lassos(PDB, args)  # printing lasso classification to screen
+        elif not args['bridges'] and not args['sbridge'] and not args['schain']: print_commands(PDB,
                                                                                               args)  # printing commands to screen
     if args['macro_ends'] or args['macro_close']: print_macrolink(PDB,
                                                                   args)  # printing components chosen automatically from a given set of chains to files
@@ -0,0 +1,1013 @@
+#!/usr/bin/env python3
+# GLN engine: Gaussian linking number between two polygonal chains computed with NumPy.
+# The segment-pair formula is the one of the former scalar linking_oneSegment of GLNtoPNG.py (Ken's notations),
+# evaluated for whole blocks of segment pairs at once instead of one pair per Python call.
+import os
+import math
+import json
+import hashlib
+import heapq
+import itertools
+import multiprocessing as mp
+import numpy as np
+
+EPS = 0.0001
+G = 0.69  # TRESHOLDS for lasso classification
+H = 0.55
+SL = 1.5
+R = 2  # precision for rounding an output
+MEMORY = 256 * 2 ** 20  # default limit (bytes) for the arrays of one tile of the segment matrix
+PAIR_BYTES = 400  # upper estimate of the temporary bytes per pair of segments in geometry_matrix
+CACHE_LIMIT = 512 * 2 ** 20  # default size (bytes) of the directory of cached results
+LEAF = 32  # segments in the smallest groups of the approximate (tree) GLN
+
+
+def points(comp):
+    # return an (N, 3) float array of coordinates; comp is either a list of (index, (x, y, z)) tuples as returned
+    # by chainRead or anything convertible to an (N, 3) array (e.g. coordinates from read_chain)
+    if len(comp) and type(comp[0]) == tuple and len(comp[0]) == 2:
+        comp = [p[1] for p in comp]
+    return np.asarray(comp, dtype=float).reshape(-1, 3)
+
+
+def _open(filename):
+    try:
+        return open(filename)
+    except IOError:
+        print(("Error: File", filename, "does not appear to exist.\n"))
+        return None
+
+
+def _table(lines):
+    # (N, 4) float array of index, x, y, z from the non-empty lines of one conformation (4 or 5 columns)
+    lines = [line for line in lines if len(line) > 1]
+    if not lines: return np.zeros((0, 4))
+    columns = len(lines[0].split())
+    words = " ".join(lines).split()
+    if len(words) == columns * len(lines): return np.array([words[c::columns] for c in range(4)], dtype=float).T
+    return np.array([line.split()[:4] for line in lines], dtype=float)
+
+
+def _cut(table, begin, end):
+    # (index, (N, 3) coordinates) of a table from _table, cut from id "begin" to "end"; empty arrays -> error/problem
+    last = np.vstack(([[-1, -1, -1, -1]], table[:-1]))
+    same = np.nonzero((np.abs(table - last) < EPS).all(axis=1))[0]
+    if len(same):
+        print(("Error: There were two identical atoms with the index", float(last[same[0]][0]),
+               "in the file. Program is done becouse of that.\n"))
+        return np.zeros(0, dtype=int), np.zeros((0, 3))
+    if begin or end:
+        b, e = begin, end
+        if begin != False and begin > end: b, e = end, begin
+        k = table[:, 0]
+        if np.all(k[1:] >= k[:-1]): table = table[np.searchsorted(k, b, 'left'):np.searchsorted(k, e, 'right')]
+        else: table = table[(k >= b) & (k <= e)]
+    return table[:, 0].astype(int), table[:, 1:]
+
+
+def _comp(lines, begin, end):
+    # (index, (N, 3) coordinates) from the lines of one conformation, cut from id "begin" to "end"
+    return _cut(_table(lines), begin, end)
+
+
+def load_xyz(filename, sidecar=False):
+    # (N, 4) table of index, x, y, z of a .xyz file with one conformation, None if there is no such file; with sidecar
+    # the table is also saved to filename + ".npz" and read from there while the .xyz file is not modified
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        _open(filename)
+        return None
+    stamp, npz = np.array([stat.st_mtime_ns, stat.st_size]), filename + ".npz"
+    if sidecar and os.path.exists(npz):
+        try:
+            with np.load(npz) as data:
+                if np.array_equal(data['stamp'], stamp): return data['table']
+        except (OSError, ValueError, KeyError):
+            pass
+    f = _open(filename)
+    if f is None: return None
+    table = _table(f.readlines())
+    f.close()
+    if sidecar:
+        try:
+            temporary = npz + ".%d.tmp" % os.getpid()
+            with open(temporary, "wb") as f: np.savez(f, table=table, stamp=stamp)
+            os.replace(temporary, npz)
+        except OSError:
+            pass
+    return table
+
+
+def read_chain(filename, begin=False, end=False, sidecar=False):
+    # Read coordinates from .xyz file, cuts them from id "begin" to "end", and return (index array, (N, 3) array);
+    # empty arrays -> error/problem; works with 4 and 5 columns file; sidecar - see load_xyz.
+    table = load_xyz(filename, sidecar)
+    if table is None: return np.zeros(0, dtype=int), np.zeros((0, 3))
+    return _cut(table, begin, end)
+
+
+def read_frames(filename, begin=False, end=False):
+    # Generator of (time, (N, 3) coordinates) for every frame of a trajectory .xyz file (frames start with
+    # "t <time>" lines, as written by converter.py -t); a file without such lines is one frame with time None.
+    # Only one frame is kept in memory at once.
+    f = _open(filename)
+    if f is None: return
+    time, lines = None, []
+    for line in f:
+        if line.startswith("t "):
+            if lines or time is not None: yield time, _comp(lines, begin, end)[1]
+            time, lines = line.split()[1], []
+        elif len(line) > 1:
+            lines.append(line)
+    f.close()
+    if lines or time is not None: yield time, _comp(lines, begin, end)[1]
+
+
+def _normalized_vector_product(a, b):
+    # return (a x b / |a x b|, mask of the pairs with a x b == 0)
+    v = np.cross(a, b)
+    d = np.sqrt(np.einsum('...i,...i->...', v, v))
+    zero = d == 0
+    v /= np.where(zero, 1, d)[..., None]
+    return v, zero
+
+
+def geometry(points):
+    # per-chain data used by every pair of segments: (segment starts, segment ends, segment vectors)
+    points = np.asarray(points, dtype=float)
+    return points[:-1], points[1:], points[1:] - points[:-1]
+
+
+def linking_segments(A1, A2, B1, B2):
+    # return links[i][j] = GLN(A1[i]A2[i], B1[j]B2[j]) for every pair of segments of A (n, 3) and B (m, 3);
+    # values are the same as those of the former linking_oneSegment, including the clamping of the scalar products
+    # and 0 for degenerate (zero-normal) pairs
+    return geometry_matrix((A1, A2, A2 - A1), (B1, B2, B2 - B1))
+
+
+def geometry_matrix(geometry1, geometry2):
+    # linking_segments for two chains given by their geometry()
+    (A1, A2, h), (B1, B2, f) = geometry1, geometry2
+    return _links(A1[:, None, :], A2[:, None, :], h[:, None, :], B1[None, :, :], B2[None, :, :], f[None, :, :])
+
+
+def _links(A1, A2, h, B1, B2, f):
+    # GLN of segments A1A2 (vectors h) and B1B2 (vectors f) given as arrays of points broadcast together
+    a, b, c, d = B1 - A1, B2 - A1, B2 - A2, B1 - A2
+
+    n1, z1 = _normalized_vector_product(a, b)
+    n2, z2 = _normalized_vector_product(b, c)
+    n3, z3 = _normalized_vector_product(c, d)
+    n4, z4 = _normalized_vector_product(d, a)
+    degenerate = z1 | z2 | z3 | z4
+
+    s = np.cross(f, h)
+    x = np.einsum('...i,...i->...', s, a)
+    sign = np.sign(x)
+    sign[np.abs(x) < EPS] = 0
+    sign[degenerate] = 0
+
+    total = np.zeros(x.shape)
+    for u, v in ((n1, n2), (n2, n3), (n3, n4), (n4, n1)):
+        sp = np.einsum('...i,...i->...', u, v)
+        sp[sp > 1 - EPS] = 1
+        sp[sp < -1 + EPS] = -1
+        total += np.arcsin(sp)
+    return sign * total / (4 * math.pi)
+
+
+def segment_matrix(points1, points2):
+    # return links[i][j] = GLN(comp1<i,i+1>, comp2<j,j+1>) as an (N1-1, N2-1) array
+    return geometry_matrix(geometry(points1), geometry(points2))
+
+
+def marginals(geometry1, geometry2, memory=MEMORY, out=None):
+    # (vlinksLOOP1, vlinksLOOP2) - sums of the segment matrix over comp1 segments and over comp2 segments,
+    # computed tile by tile so that no more than about memory bytes are used at once; the tiles are also written
+    # into out (e.g. a numpy.memmap of shape (N1-1, N2-1)) if given
+    n1, n2 = len(geometry1[0]), len(geometry2[0])
+    cols = max(1, min(n2, memory // PAIR_BYTES))
+    rows = max(1, min(n1, memory // (PAIR_BYTES * cols)))
+    vlinksLOOP1, vlinksLOOP2 = np.zeros(n2), np.zeros(n1)
+    for r in range(0, n1, rows):
+        tile1 = tuple(x[r:r + rows] for x in geometry1)
+        for c in range(0, n2, cols):
+            links = geometry_matrix(tile1, tuple(x[c:c + cols] for x in geometry2))
+            vlinksLOOP1[c:c + cols] += links.sum(axis=0)
+            vlinksLOOP2[r:r + rows] += links.sum(axis=1)
+            if out is not None: out[r:r + rows, c:c + cols] = links
+    return vlinksLOOP1, vlinksLOOP2
+
+
+def _tree(geometry):
+    # binary tree of groups of consecutive segments: (first, last + 1, centre, radius of the ball around all their
+    # ends, total length, sum of segment vectors, children)
+    starts, ends, vectors = geometry
+    lengths = np.sqrt((vectors ** 2).sum(axis=1))
+
+    def node(first, last):
+        ends_ = np.vstack((starts[first:last], ends[last - 1:last]))
+        centre = (ends_.min(axis=0) + ends_.max(axis=0)) / 2
+        radius = np.sqrt(((ends_ - centre) ** 2).sum(axis=1)).max()
+        children = ()
+        if last - first > LEAF: children = (node(first, (first + last) // 2), node((first + last) // 2, last))
+        return first, last, centre, radius, lengths[first:last].sum(), vectors[first:last].sum(axis=0), children
+
+    return node(0, len(vectors))
+
+
+def _far_error(A, B):
+    # error of taking groups A and B together, None if their balls overlap
+    r = A[2] - B[2]
+    d = math.sqrt(r.dot(r))
+    if d <= A[3] + B[3]: return None
+    return A[4] * B[4] * 2 * (A[3] + B[3]) / (4 * math.pi * (d - A[3] - B[3]) ** 3)
+
+
+def approximate_marginals(geometry1, geometry2, tolerance, memory=MEMORY):
+    # (vlinksLOOP1, vlinksLOOP2, bound) as in marginals, but groups of segments far from each other are taken
+    # together: for groups A and B with centres cA, cB the Gauss integrand is evaluated once at (cA, cB), which gives
+    # (cA - cB) . (TA x TB) / (4 pi |cA - cB|^3) with TA, TB the sums of their segment vectors (split over single
+    # segments for the marginals). Its error is at most LA LB 2 (rA + rB) / (4 pi d^3), with L the lengths, r the radii
+    # of the groups and d the distance between their balls. Starting from the largest groups with separated balls,
+    # the pair with the largest error is split (down to LEAF segments, then calculated exactly) until the sum of
+    # the errors - bound - is at most tolerance; bound also bounds the error of every sub-chain GLN.
+    n1, n2 = len(geometry1[0]), len(geometry2[0])
+    vlinksLOOP1, vlinksLOOP2 = np.zeros(n2), np.zeros(n1)
+    vectors1, vectors2 = geometry1[2], geometry2[2]
+    exact = {}  # first segment of a leaf of comp1 -> (its last + 1, segments of comp2 calculated exactly with it)
+    far = []  # heap of (-error, number, A, B)
+    bound, numbers = 0.0, itertools.count()
+
+    def split(A, B):
+        # pairs of children of A and B, splitting the larger group
+        if A[6] and (A[1] - A[0] >= B[1] - B[0] or not B[6]): return [(child, B) for child in A[6]]
+        return [(A, child) for child in B[6]]
+
+    stack = [(_tree(geometry1), _tree(geometry2))]
+    while stack or (far and bound > tolerance):
+        if stack:
+            A, B = stack.pop()
+            error = _far_error(A, B)
+            if error is not None:
+                heapq.heappush(far, (-error, next(numbers), A, B))
+                bound += error
+                continue
+        else:
+            error, number, A, B = heapq.heappop(far)
+            bound += error
+        if not A[6] and not B[6]:
+            exact.setdefault(A[0], (A[1], []))[1].append(np.arange(B[0], B[1]))
+        else:
+            stack.extend(split(A, B))
+
+    for error, number, (a0, a1, cA, rA, LA, TA, childrenA), (b0, b1, cB, rB, LB, TB, childrenB) in far:
+        g = (cA - cB) / (4 * math.pi * np.linalg.norm(cA - cB) ** 3)
+        vlinksLOOP1[b0:b1] += np.cross(TA, vectors2[b0:b1]).dot(g)
+        vlinksLOOP2[a0:a1] += np.cross(vectors1[a0:a1], TB).dot(g)
+    for a0, (a1, segments) in exact.items():
+        segments = np.concatenate(segments)
+        v1, v2 = marginals(tuple(x[a0:a1] for x in geometry1), tuple(x[segments] for x in geometry2), memory)
+        np.add.at(vlinksLOOP1, segments, v1)
+        vlinksLOOP2[a0:a1] += v2
+    return vlinksLOOP1, vlinksLOOP2, sum(-error for error, number, A, B in far)
+
+
+class Incremental:
+    # Segment matrix of two comps followed over frames: only the rows (columns) of segments of comp1 (comp2) with
+    # an end that moved more than tolerance since the segment was last calculated are calculated again; every
+    # refresh frames the whole matrix is calculated to bound the drift.
+    def __init__(self, tolerance=0.0, refresh=100, memory=MEMORY):
+        self.tolerance, self.refresh, self.memory = tolerance, max(1, refresh), memory
+        self.links, self.reference1, self.reference2 = None, None, None
+        self.frames = 0
+
+    def moved(self, points, reference):
+        # indices of segments with a moved end; their ends become the new reference
+        moved = np.sqrt(((points - reference) ** 2).sum(axis=1)) > self.tolerance
+        reference[moved] = points[moved]
+        return np.nonzero(moved[:-1] | moved[1:])[0]
+
+    def update(self, points1, points2):
+        # (vlinksLOOP1, vlinksLOOP2) of the next frame
+        geometry1, geometry2 = geometry(points1), geometry(points2)
+        shape = (len(points1) - 1, len(points2) - 1)
+        if self.links is None or self.links.shape != shape or self.frames % self.refresh == 0:
+            self.links = np.empty(shape)
+            marginals(geometry1, geometry2, self.memory, self.links)
+            self.reference1, self.reference2 = np.array(points1, dtype=float), np.array(points2, dtype=float)
+        else:
+            rows, cols = self.moved(points1, self.reference1), self.moved(points2, self.reference2)
+            if len(rows):
+                block = np.empty((len(rows), shape[1]))
+                marginals(tuple(x[rows] for x in geometry1), geometry2, self.memory, block)
+                self.links[rows] = block
+            if len(cols):
+                block = np.empty((shape[0], len(cols)))
+                marginals(geometry1, tuple(x[cols] for x in geometry2), self.memory, block)
+                self.links[:, cols] = block
+        self.frames += 1
+        return self.links.sum(axis=0), self.links.sum(axis=1)
+
+
+def prefix_sums(vlinks):
+    # return P of length len(vlinks)+1 with P[j] = vlinks[0] + ... + vlinks[j-1];
+    # GLN between the whole loop and the part <i-j> of the other comp is P[j] - P[i]
+    P = np.zeros(len(vlinks) + 1)
+    np.cumsum(vlinks, out=P[1:])
+    return P
+
+
+def loop_matrix(P, dtype=np.float64):
+    # return linksLOOP as a dense (N, N) array built from the prefix sums P:
+    # linksLOOP[i][j] = P[j] - P[i] for i < j and 0 below the diagonal
+    P = np.asarray(P).astype(dtype)
+    linksLOOP = P[None, :] - P[:, None]
+    index = np.arange(len(P))
+    linksLOOP[index[:, None] >= index[None, :]] = 0
+    return linksLOOP
+
+
+def extremum(P, largest=True):
+    # return (value, i, j) of the largest (or the smallest) P[j] - P[i] over i < j in O(N), using the running
+    # maximum of the prefix sums; ties go to the first (i, j) in row order, as in a scan over linksLOOP[i][j]
+    Q = np.asarray(P) if largest else -np.asarray(P)
+    if len(Q) < 2: return 0.0, 0, 0
+    S = np.maximum.accumulate(Q[::-1])[::-1]  # S[i] = max(Q[i:])
+    i = int(np.argmax(S[1:] - Q[:-1]))
+    j = i + 1 + int(np.argmax(Q[i + 1:] == S[i + 1]))
+    return float(P[j] - P[i]), i, j
+
+
+def extrema(P, k, largest=True):
+    # return up to k (value, i, j) of the largest (or the smallest) sub-chain GLNs P[j] - P[i] whose sub-chains <i-j>
+    # do not share segments; greedy, each pick is the extremum of the part of the chain not yet taken, O(k*N)
+    P = np.asarray(P)
+    parts, result = [(0, len(P) - 1)], []
+    while parts and len(result) < k:
+        best = None
+        for n, (b, e) in enumerate(parts):
+            value, i, j = extremum(P[b:e + 1], largest)
+            if best is None or (value > best[0] if largest else value < best[0]): best = (value, b + i, b + j, n)
+        value, i, j, n = best
+        b, e = parts.pop(n)
+        parts[n:n] = [part for part in ((b, i), (j, e)) if part[1] > part[0]]
+        result.append((value, i, j))
+    return result
+
+
+def comps_overlie(points1, points2):
+    # return True if there are points on two comps that overlie (all coordinates closer than EPS);
+    # points are put into a grid of 2*EPS cells hashed to int64 keys (sorted, for searchsorted), so each point
+    # of 1st comp is compared only with points of 2nd comp hashed as one of 27 cells around it, O((N1+N2)*log(N2))
+    points1, points2 = np.asarray(points1, dtype=float), np.asarray(points2, dtype=float)
+    if len(points1) == 0 or len(points2) == 0: return False
+    keys2 = _cell_keys(np.floor(points2 / (2 * EPS)))
+    order = np.argsort(keys2, kind='stable')
+    keys2 = keys2[order]
+    cells1 = np.floor(points1 / (2 * EPS))
+    for offset in itertools.product((-1, 0, 1), repeat=3):
+        keys1 = _cell_keys(cells1 + offset)
+        first, last = np.searchsorted(keys2, keys1, 'left'), np.searchsorted(keys2, keys1, 'right')
+        for k in np.nonzero(last > first)[0]:
+            near = points2[order[first[k]:last[k]]]
+            if (np.abs(near - points1[k]) < EPS).all(axis=1).any(): return True
+    return False
+
+
+def _cell_keys(cells):
+    # int64 hash of integer grid cells (N, 3); colliding cells only give more points to compare
+    cells = cells.astype(np.int64)
+    with np.errstate(over='ignore'):
+        return cells[:, 0] * np.int64(73856093) ^ cells[:, 1] * np.int64(19349663) ^ cells[:, 2] * np.int64(83492791)
+
+
+def classify(whole, mmax, mmin):
+    # lasso class from the (rounded) whole, max and min GLN
+    if max(mmax, abs(mmin)) >= SL: return "LS"
+    if max(mmax, abs(mmin)) < G: return "L0"
+    if abs(mmin) < G <= mmax or abs(mmin) >= G > mmax: return "L1"
+    if abs(whole) < H: return "L2+"
+    return "L3+"
+
+
+def _loop_summary(P, loop):
+    # whole, max, min (with indices) and max0/min0 of one comp treated as a loop; values as printed by GLNtoPNG
+    whole = float(P[-1])
+    mmax, xmax, ymax, mmin, xmin, ymin, max0, ymax0, min0, ymin0 = 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
+    if loop:
+        m, i, j = extremum(P)
+        if m > mmax: mmax, xmax, ymax = m, i, j
+        m, i, j = extremum(P, largest=False)
+        if m < mmin: mmin, xmin, ymin = m, i, j
+        if whole > max0: max0, ymax0 = whole, len(P) - 1
+        if whole < min0: min0, ymin0 = whole, len(P) - 1
+    whole, mmax, mmin, max0, min0 = round(whole, R), round(mmax, R), round(mmin, R), round(max0, R), round(min0, R)
+    return {'wh': whole, 'max': mmax, 'xmax': xmax, 'ymax': ymax, 'min': mmin, 'xmin': xmin, 'ymin': ymin,
+            'max0': max0, 'ymax0': ymax0, 'min0': min0, 'ymin0': ymin0, 'cl': classify(whole, mmax, mmin)}
+
+
+def compute(comp1, comp2, close=(False, False), loop=0, matrices=True, memory=MEMORY, out=None, tolerance=None):
+    # GLN between two comps given as (N, 3) coordinates or lists from read_chain;
+    # close - if we close 1st/2nd comp, loop - 0:both, 1:only 1st comp as a loop, 2:only 2nd comp as a loop.
+    # Returns a dict with N1, N2, prefix sums P1/P2, '1' and '2' summaries (wh, max, min, their indices, cl)
+    # and, if matrices, the linksLOOP1/linksLOOP2 arrays; raises ValueError with the GLNtoPNG message otherwise.
+    # The segment matrix is computed in tiles of about memory bytes and, if out is a filename, stored there
+    # as a numpy.memmap of float64 (N1-1, N2-1). With tolerance, GLN is approximated (see approximate_marginals)
+    # with an absolute error of at most tolerance, and the bound achieved is returned as 'bound'; the segment matrix
+    # is not computed then, so tolerance cannot be used with out.
+    if tolerance is not None and out:
+        raise ValueError("Error: the segment matrix (-mmap) cannot be stored with approximated GLN (-approx).")
+    points1, points2 = closed(comp1, close[0]), closed(comp2, close[1])
+    check(points1, points2)
+    if tolerance is not None:
+        vlinksLOOP1, vlinksLOOP2, bound = approximate_marginals(geometry(points1), geometry(points2), tolerance, memory)
+        result = summary(vlinksLOOP1, vlinksLOOP2, loop, matrices)
+        result['bound'] = bound
+        return result
+    links = None
+    if out: links = np.memmap(out, dtype=np.float64, mode='w+', shape=(len(points1) - 1, len(points2) - 1))
+    vlinksLOOP1, vlinksLOOP2 = marginals(geometry(points1), geometry(points2), memory, links)
+    if links is not None: links.flush()
+    return summary(vlinksLOOP1, vlinksLOOP2, loop, matrices)
+
+
+def compute_closures(comp1, comp2, loop=0, memory=MEMORY):
+    # compute (without matrices) for all four ways of closing the comps, (False, False), (True, False),
+    # (False, True) and (True, True), at the cost of about one run: the segment matrix of the open comps is
+    # computed once and closing a comp only adds the row (column) of its closing segment. Returns a dict
+    # close -> result, or the reason (e.g. "comps-overlie") if GLN cannot be calculated for that closure.
+    points1, points2 = points(comp1), points(comp2)
+    results, reasons = {}, {}
+    for close in itertools.product((False, True), repeat=2):
+        try:
+            check(closed(points1, close[0]), closed(points2, close[1]))
+        except ValueError as e:
+            reasons[close] = str(e).split(" ")[0]
+    if len(reasons) == 4: return reasons
+    geometry1, geometry2 = geometry(closed(points1, True)), geometry(closed(points2, True))
+    n1, n2 = len(points1) - 1, len(points2) - 1  # segments of the open comps
+    vlinksLOOP1, vlinksLOOP2 = marginals(tuple(x[:n1] for x in geometry1), tuple(x[:n2] for x in geometry2), memory)
+    row = geometry_matrix(tuple(x[n1:] for x in geometry1), geometry2)[0]  # closing segment of comp1, n2 + 1
+    column = geometry_matrix(geometry1, tuple(x[n2:] for x in geometry2))[:, 0]  # closing segment of comp2, n1 + 1
+    for close in itertools.product((False, True), repeat=2):
+        if close in reasons:
+            results[close] = reasons[close]
+            continue
+        v1, v2 = vlinksLOOP1.copy(), vlinksLOOP2.copy()
+        if close[0]: v1 += row[:n2]
+        if close[1]: v2 += column[:n1]
+        if close[1]: v1 = np.append(v1, column[:n1].sum() + (row[n2] if close[0] else 0))
+        if close[0]: v2 = np.append(v2, row[:n2].sum() + (row[n2] if close[1] else 0))
+        results[close] = summary(v1, v2, loop)
+    return results
+
+
+def closure_points(comp, count, radius=50, seed=None):
+    # count random points on the sphere of radius around the middle of the ends of comp, as the one_point closures
+    # drawn by converter.py (generate_closure)
+    comp = points(comp)
+    random = np.random.default_rng(seed).random((count, 2))
+    theta, phi = 2 * np.pi * random[:, 0], np.arccos(1 - 2 * random[:, 1])
+    sphere = np.stack((np.sin(phi) * np.cos(theta), np.sin(phi) * np.sin(theta), np.cos(phi)), axis=1)
+    return (comp[0] + comp[-1]) / 2 + radius * sphere
+
+
+def _closing(comp, closures):
+    # geometry of the two segments (last point -> X, X -> first point) closing comp through each point X of
+    # closures, as arrays (M, 2, 3)
+    last, first = np.broadcast_to(comp[-1], closures.shape), np.broadcast_to(comp[0], closures.shape)
+    starts, ends = np.stack((last, closures), axis=1), np.stack((closures, first), axis=1)
+    return starts, ends, ends - starts
+
+
+def random_closures(comp1, comp2, closures1=None, closures2=None, quantiles=(5, 25, 50, 75, 95), bins=20,
+                    memory=MEMORY):
+    # distribution of the whole GLN of two comps closed through M points each (e.g. from closure_points): the k-th
+    # closure closes comp1 through closures1[k] and comp2 through closures2[k]; None leaves a comp open. The segment
+    # matrix of the open comps is computed once, every closure only adds the rows (columns) of its two closing
+    # segments. Returns a dict with 'wh' (M unrounded values), 'mean', 'quantiles' (percent -> value) and
+    # 'histogram' (counts, edges); raises ValueError as compute.
+    points1, points2 = points(comp1), points(comp2)
+    check(points1, points2)
+    geometry1, geometry2 = geometry(points1), geometry(points2)
+    vlinksLOOP1, vlinksLOOP2 = marginals(geometry1, geometry2, memory)
+    closings1 = None if closures1 is None else _closing(points1, np.asarray(closures1, dtype=float).reshape(-1, 3))
+    closings2 = None if closures2 is None else _closing(points2, np.asarray(closures2, dtype=float).reshape(-1, 3))
+    counts = [len(c[0]) for c in (closings1, closings2) if c is not None]
+    if not counts or min(counts) != max(counts) or counts[0] == 0:
+        raise ValueError("Error: the same positive number of closures is needed for closed comps.")
+    whole = np.full(counts[0], vlinksLOOP1.sum())
+    if closings1 is not None:
+        closing = tuple(x.reshape(-1, 3) for x in closings1)
+        whole += marginals(closing, geometry2, memory)[1].reshape(-1, 2).sum(axis=1)
+    if closings2 is not None:
+        closing = tuple(x.reshape(-1, 3) for x in closings2)
+        whole += marginals(geometry1, closing, memory)[0].reshape(-1, 2).sum(axis=1)
+    if closings1 is not None and closings2 is not None:
+        for i, j in itertools.product((0, 1), repeat=2):
+            whole += _links(*[x[:, i] for x in closings1] + [x[:, j] for x in closings2])
+    histogram = np.histogram(whole, bins)
+    return {'wh': whole, 'mean': float(whole.mean()),
+            'quantiles': dict((q, float(v)) for q, v in zip(quantiles, np.percentile(whole, quantiles))),
+            'histogram': (histogram[0], histogram[1])}
+
+
+def closed(comp, close):
+    # (N, 3) coordinates of comp, with its first point appended if we close it
+    comp = points(comp)
+    if close and len(comp): comp = np.vstack((comp, comp[:1]))
+    return comp
+
+
+def check(points1, points2):
+    # raise ValueError with the GLNtoPNG message if GLN between two comps cannot be calculated
+    N1, N2 = len(points1), len(points2)
+    if N1 == 0 or N2 == 0: raise ValueError("empty-comp . . . . . . . . . . . . . . .")
+    if N1 == 1 or N2 == 1: raise ValueError("1-length-comp . . . . . . . . . . . . . . .")
+    if comps_overlie(points1, points2): raise ValueError("comps-overlie . . . . . . . . . . . . . . .")
+
+
+def summary(vlinksLOOP1, vlinksLOOP2, loop=0, matrices=False):
+    # the dict returned by compute for the marginals of the segment matrix of two comps
+    N1, N2 = len(vlinksLOOP2) + 1, len(vlinksLOOP1) + 1
+    P1, P2 = prefix_sums(vlinksLOOP1), prefix_sums(vlinksLOOP2)
+    result = {'N1': N1, 'N2': N2, 'P1': P1, 'P2': P2,
+              '1': _loop_summary(P1, loop == 0 or loop == 1), '2': _loop_summary(P2, loop == 0 or loop == 2)}
+    return _with_matrices(result) if matrices else result
+
+
+def _with_matrices(result):
+    result['linksLOOP1'], result['linksLOOP2'] = loop_matrix(result['P1']), loop_matrix(result['P2'])
+    return result
+
+
+def summed_area(comp1, comp2, close=(False, False), memory=MEMORY, out=None):
+    # (N1, N2) summed-area table S of the segment matrix of two comps: S[i][j] = sum of links[a][b] for a < i, b < j,
+    # computed in tiles of about memory bytes and stored as a numpy.memmap of float64 if out is a filename;
+    # raises ValueError as compute
+    points1, points2 = closed(comp1, close[0]), closed(comp2, close[1])
+    check(points1, points2)
+    geometry1, geometry2 = geometry(points1), geometry(points2)
+    n1, n2 = len(geometry1[0]), len(geometry2[0])
+    if out: table = np.memmap(out, dtype=np.float64, mode='w+', shape=(n1 + 1, n2 + 1))
+    else: table = np.zeros((n1 + 1, n2 + 1))
+    cols = max(1, min(n2, memory // PAIR_BYTES))
+    rows = max(1, min(n1, memory // (PAIR_BYTES * cols)))
+    for r in range(0, n1, rows):
+        tile1, block = tuple(x[r:r + rows] for x in geometry1), table[r + 1:r + rows + 1]
+        for c in range(0, n2, cols):
+            block[:, c + 1:c + cols + 1] = geometry_matrix(tile1, tuple(x[c:c + cols] for x in geometry2))
+        np.cumsum(block, axis=1, out=block)
+        np.cumsum(block, axis=0, out=block)
+        block += table[r]
+    if out: table.flush()
+    return table
+
+
+class Subchains:
+    # GLN between any sub-chain <i1, i2> of comp1 and any sub-chain <j1, j2> of comp2 in O(1) from a summed-area
+    # table (see summed_area), e.g. Subchains(summed_area(comp1, comp2)); indices are those of points, as in
+    # linksLOOP, so gln(0, N1 - 1, j1, j2) == linksLOOP1[j1][j2] and gln(i1, i2, 0, N2 - 1) == linksLOOP2[i1][i2]
+    def __init__(self, table):
+        self.table = table
+
+    def gln(self, i1, i2, j1, j2):
+        # GLN of the sub-chains; the arguments may also be arrays (broadcast together) for a batch of queries
+        S = self.table
+        return S[i2, j2] - S[i1, j2] - S[i2, j1] + S[i1, j1]
+
+    def windows(self, length1, length2):
+        # (N1 - length1, N2 - length2) array of GLN between every sub-chain <i, i + length1> of comp1 and every
+        # sub-chain <j, j + length2> of comp2 (lengths at least 1), indexed by [i][j]
+        S = self.table
+        return S[length1:, length2:] - S[:-length1, length2:] - S[length1:, :-length2] + S[:-length1, :-length2]
+
+    def extremum(self, length1, length2, largest=True):
+        # (value, i, j) of the largest (or the smallest) GLN between windows of the given lengths
+        windows = self.windows(length1, length2)
+        k = np.argmax(windows) if largest else np.argmin(windows)
+        i, j = np.unravel_index(k, windows.shape)
+        return float(windows[i, j]), int(i), int(j)
+
+
+def lassos(comp, loops, memory=MEMORY):
+    # GLN of every loop <i, j> of one chain (points i..j closed by the segment j -> i) with its N-tail (points
+    # 0..i-1) and C-tail (points j+1..N-1); comp - (N, 3) coordinates, loops - (i, j) point indices. The segment
+    # matrix of the chain is computed once, in tiles of about memory bytes (plus one row of N-1 floats per loop),
+    # and every loop only adds the row of its closing segment. Returns one (N-tail, C-tail) pair per loop of '1'
+    # summaries of compute (the loop vs sub-chains of the tail) or the reasons (e.g. "empty-comp") if GLN cannot
+    # be calculated.
+    chain = points(comp)
+    geometry1 = geometry(chain)
+    n = len(geometry1[0])
+    loops = [(min(i, j), max(i, j)) for i, j in loops]
+    begins, ends = np.array([i for i, j in loops], dtype=int), np.array([j for i, j in loops], dtype=int)
+    loop_sums = np.zeros((len(loops), n))  # loop_sums[k] = sum of the rows of the segment matrix of the k-th loop
+    cols = max(1, min(n, memory // PAIR_BYTES))
+    rows = max(1, min(n, memory // (PAIR_BYTES * cols)))
+    for r in range(0, n, rows):
+        tile1 = tuple(x[r:r + rows] for x in geometry1)
+        height = len(tile1[0])
+        first, last = np.clip(begins - r, 0, height), np.clip(ends - r, 0, height)  # rows of every loop in the tile
+        if not (first < last).any(): continue
+        for c in range(0, n, cols):
+            links = geometry_matrix(tile1, tuple(x[c:c + cols] for x in geometry1))
+            prefix = np.vstack((np.zeros((1, links.shape[1])), np.cumsum(links, axis=0)))
+            loop_sums[:, c:c + cols] += prefix[last] - prefix[first]
+
+    results = []
+    for k, (i, j) in enumerate(loops):
+        closing = (chain[j:j + 1], chain[i:i + 1], chain[i:i + 1] - chain[j:j + 1])
+        vlinksLOOP1 = loop_sums[k] + geometry_matrix(closing, geometry1)[0]
+        tails = []
+        for tail, segments in ((chain[:i], vlinksLOOP1[:max(i - 1, 0)]), (chain[j + 1:], vlinksLOOP1[j + 1:])):
+            try:
+                check(closed(chain[i:j + 1], True), tail)
+            except ValueError as e:
+                tails.append(str(e).split(" ")[0])
+                continue
+            tails.append(_loop_summary(prefix_sums(segments), True))
+        results.append(tuple(tails))
+    return results
+
+
+def time_series(options, cwd=""):
+    # Generator of (frame, time, result) for the first two comps of parsed GLNtoPNG options read frame by frame
+    # from trajectory files; result is compute() without matrices, or the reason (e.g. "comps-overlie") if GLN
+    # cannot be calculated for that frame. A file with one conformation is used for all frames of the other one.
+    # With options['tolerance'] the segment matrix is updated incrementally (see Incremental).
+    frames = []
+    for filename, begin, end in options['components'][:2]:
+        frames.append(read_frames(os.path.join(cwd, filename), begin, end))
+    first = [next(f, None) for f in frames]
+    if None in first: return
+    static = [time is None for time, comp in first]  # one conformation only
+    if all(static): frames = [iter([first[0]]), iter([first[1]])]
+    else: frames = [_repeat(first[k]) if static[k] else _chain(first[k], frames[k]) for k in range(2)]
+
+    engine = None
+    if options['tolerance'] is not None:
+        engine = Incremental(options['tolerance'], options['refresh'], options['memory'])
+    for frame, ((time1, comp1), (time2, comp2)) in enumerate(zip(*frames)):
+        try:
+            if engine is None:
+                result = compute(comp1, comp2, options['close'], options['loop'], matrices=False,
+                                 memory=options['memory'])
+            else:
+                points1, points2 = closed(comp1, options['close'][0]), closed(comp2, options['close'][1])
+                check(points1, points2)
+                result = summary(*engine.update(points1, points2), loop=options['loop'])
+        except ValueError as e:
+            result = str(e).split(" ")[0]
+        yield frame, time1 if time1 is not None else time2, result
+
+
+def _repeat(item):
+    while True: yield item
+
+
+def _chain(item, rest):
+    yield item
+    for item in rest: yield item
+
+
+_pairs_data = {}
+
+
+def _init_pairs(points, geometries, loop, memory, tolerance):
+    # pool initializer: chains and their geometry are sent to every worker once, not with every pair
+    _pairs_data['points'], _pairs_data['geometries'] = points, geometries
+    _pairs_data['loop'], _pairs_data['memory'], _pairs_data['tolerance'] = loop, memory, tolerance
+
+
+def _pair(pair):
+    k, l = pair
+    points, geometries = _pairs_data['points'], _pairs_data['geometries']
+    try:
+        check(points[k], points[l])
+    except ValueError as e:
+        return k, l, str(e).split(" ")[0]
+    if _pairs_data['tolerance'] is None:
+        return k, l, summary(*marginals(geometries[k], geometries[l], _pairs_data['memory']), loop=_pairs_data['loop'])
+    vlinksLOOP1, vlinksLOOP2, bound = approximate_marginals(geometries[k], geometries[l], _pairs_data['tolerance'],
+                                                            _pairs_data['memory'])
+    result = summary(vlinksLOOP1, vlinksLOOP2, _pairs_data['loop'])
+    result['bound'] = bound
+    return k, l, result
+
+
+def all_pairs(comps, close=False, loop=0, processes=None, memory=MEMORY, cache=None, ion=False,
+              tolerance=None):
+    # GLN summaries for all K(K-1)/2 pairs of K comps; the geometry of every comp is computed once.
+    # Returns a list of (k, l, result) for k < l, in order, with result as returned by compute without matrices, or
+    # the reason (e.g. "comps-overlie") if the pair cannot be calculated. processes - size of the process pool,
+    # None: number of CPUs, 1: no pool; memory - limit for the tiles of every process; cache - a Cache for the
+    # results, only the pairs not found there are calculated; tolerance - as in compute.
+    points = [closed(comp, close) for comp in comps]
+    geometries = [geometry(p) if len(p) > 1 else None for p in points]
+    pairs = [(k, l) for k in range(len(comps)) for l in range(k + 1, len(comps))]
+    results, keys = {}, {}
+    if cache is not None:
+        for k, l in pairs:
+            keys[k, l] = cache.key(comps[k], comps[l], (close, close), loop, ion, tolerance)
+            result = cache.get(keys[k, l])
+            if result is not None: results[k, l] = result
+        pairs = [pair for pair in pairs if pair not in results]
+
+    if processes == 1 or len(pairs) < 2:
+        _init_pairs(points, geometries, loop, memory, tolerance)
+        calculated = [_pair(pair) for pair in pairs]
+    else:
+        pool = mp.Pool(processes, initializer=_init_pairs, initargs=(points, geometries, loop, memory, tolerance))
+        try:
+            calculated = pool.map(_pair, pairs, chunksize=max(1, len(pairs) // (8 * (processes or mp.cpu_count()))))
+        finally:
+            pool.close()
+            pool.join()
+    for k, l, result in calculated:
+        results[k, l] = result
+        if cache is not None and type(result) != str: cache.put(keys[k, l], result)
+    return [(k, l, results[k, l]) for k, l in sorted(results)]
+
+
+class Cache:
+    # On-disk cache of compute() results: one compressed .npz file (prefix sums and summaries, from which the
+    # linksLOOP matrices follow exactly) per hash of the coordinates of both comps and of the close, loop, ion and
+    # approximation tolerance options. When the directory grows over limit bytes, the least recently used files
+    # are removed. The size of the directory is listed once and then kept as a running total of the files put, so
+    # the directory is scanned again only when the total goes over the limit.
+    def __init__(self, directory, limit=CACHE_LIMIT):
+        self.directory, self.limit = directory, limit
+        if not os.path.exists(directory): os.makedirs(directory)
+        self.size = None  # bytes of the cached files, read on the first put
+
+    def key(self, comp1, comp2, close, loop, ion=False, tolerance=None):
+        sha = hashlib.sha1()
+        for comp in (comp1, comp2):
+            comp = np.ascontiguousarray(points(comp))
+            sha.update(str(comp.shape).encode())
+            sha.update(comp.tobytes())
+        sha.update(("close" + str(tuple(close)) + "loop" + str(loop) + "ion" + str(bool(ion))).encode())
+        if tolerance is not None: sha.update(("tolerance" + repr(float(tolerance))).encode())
+        return sha.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key, matrices=False):
+        # cached result (as returned by compute) or None
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                result = json.loads(str(data['summary']))
+                result['P1'], result['P2'] = data['P1'], data['P2']
+        except (IOError, ValueError, KeyError):
+            return None
+        os.utime(path, None)  # recently used
+        return _with_matrices(result) if matrices else result
+
+    def put(self, key, result):
+        data = dict((k, v) for k, v in result.items() if k in ('N1', 'N2', '1', '2', 'bound'))
+        temporary = self.path(key) + "." + str(os.getpid())
+        with open(temporary, "wb") as f:
+            np.savez_compressed(f, P1=result['P1'], P2=result['P2'], summary=json.dumps(data))
+        if self.size is None: self.size = sum(f[1] for f in self.files())
+        path = self.path(key)
+        if os.path.exists(path): self.size -= os.path.getsize(path)  # replaced
+        os.replace(temporary, path)
+        self.size += os.path.getsize(path)
+        if self.size > self.limit: self.evict()
+
+    def files(self):
+        # (mtime, size, path) of every cached file
+        files = [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".npz")]
+        return [(stat.st_mtime, stat.st_size, f) for stat, f in ((os.stat(f), f) for f in files)]
+
+    def evict(self):
+        # remove the least recently used files until the directory fits the limit; the directory is listed again,
+        # as other processes may share it
+        files = sorted(self.files())
+        self.size = sum(f[1] for f in files)
+        for mtime, fsize, f in files:
+            if self.size <= self.limit: break
+            os.remove(f)
+            self.size -= fsize
+
+    def compute(self, comp1, comp2, close=(False, False), loop=0, ion=False, matrices=True, memory=MEMORY,
+                tolerance=None):
+        # compute() through the cache
+        key = self.key(comp1, comp2, close, loop, ion, tolerance)
+        result = self.get(key, matrices)
+        if result is None:
+            result = compute(comp1, comp2, close, loop, matrices=False, memory=memory, tolerance=tolerance)
+            self.put(key, result)
+            if matrices: _with_matrices(result)
+        return result
+
+
+def rgb(linksLOOP):
+    # colorFromGLN of GLNtoPNG applied to a whole array; returns uint8 array with the last axis (r, g, b)
+    gln = np.asarray(linksLOOP, dtype=float)
+    with np.errstate(divide='ignore'):
+        far = 255 / (gln * gln)
+    neg, pos = gln <= 0, gln <= 1
+    r = np.where(gln < -1, far, np.where(neg, 255, np.where(pos, 255 * (1 - gln), 0)))
+    g = np.where(gln < -1, 0, np.where(neg, 255 * (1 + gln), np.where(pos, 255 * (1 - gln), 0)))
+    b = np.where(gln < -1, 0, np.where(neg, 255 * (1 + gln), np.where(pos, 255, far)))
+    return np.stack((r, g, b), axis=-1).astype(np.uint8)
+
+
+def _cells(n, cell, pixels):
+    # for every pixel along one axis: the first and the last of n cells painted over it, when cell k is painted
+    # from int(k * cell) to int(k * cell) + int(cell) inclusive (cells overlap on their borders)
+    starts = (np.arange(n) * cell).astype(int)
+    px = np.arange(pixels)
+    return np.searchsorted(starts + int(cell), px), np.searchsorted(starts, px, side='right') - 1
+
+
+def heatmap(P, width, height):
+    # picture of the upper triangle of linksLOOP[i][j] = P[j] - P[i] (P - prefix sums) as an uint8 (height, width, 3)
+    # array: linksLOOP[i][j] at column i and row j, white elsewhere; pixel for pixel what painting the cells one by
+    # one (i, then j increasing) gives. Only the values of the pixels are calculated, never the whole linksLOOP.
+    P = np.asarray(P, dtype=float)
+    n = len(P)
+    cell = float(width) / n
+    first_i, last_i = _cells(n, cell, width)
+    first_j, last_j = _cells(n, cell, height)
+    # the last cell painted over a pixel is the one with the largest i < j, then the largest j
+    i, j = np.minimum(last_i[None, :], last_j[:, None] - 1), last_j[:, None]
+    painted = (i >= first_i[None, :]) & (i >= 0) & (j >= first_j[:, None])
+    picture = np.full((height, width, 3), 255, np.uint8)
+    picture[painted] = rgb(P[np.broadcast_to(j, i.shape)[painted]] - P[i[painted]])
+    return picture
+
+
+def save_matrix(filename, P, loop_summary, quantize=False):
+    # write linksLOOP (from its prefix sums P) to a compressed .npz file as float32 or, if quantize, as int16
+    # together with the scale of its values, and the summary of the loop (values and indices of the extrema, cl)
+    linksLOOP, scale = loop_matrix(P, np.float32), 1.0
+    if quantize:
+        scale = float(np.abs(linksLOOP).max()) / 32767 or 1.0
+        linksLOOP = np.round(linksLOOP / scale).astype(np.int16)
+    with open(filename, "wb") as f:
+        np.savez_compressed(f, linksLOOP=linksLOOP, scale=scale, summary=json.dumps(loop_summary))
+
+
+def load_matrix(filename):
+    # (linksLOOP as float32, summary of the loop) from a file written by save_matrix
+    with np.load(filename) as data:
+        linksLOOP = data['linksLOOP']
+        if linksLOOP.dtype == np.int16: linksLOOP = (linksLOOP * data['scale']).astype(np.float32)
+        return linksLOOP, json.loads(str(data['summary']))
+
+
+class Pyramid:
+    # Multi-resolution view of linksLOOP[i][j] = P[j] - P[i] (i < j) for zooming: at level k the matrix is cut into
+    # blocks of 2**k x 2**k cells and every block keeps the largest and the smallest GLN in it. Off the diagonal
+    # those are max(P over block j) - min(P over block i) and the other way round, so every level is kept as
+    # per-block reductions of P (O(N) memory in total) and any tile is a lookup, without linksLOOP.
+    def __init__(self, P):
+        self.P = np.asarray(P, dtype=float)
+        self.N = len(self.P)
+        self.levels = []
+        size = 1
+        while True:
+            self.levels.append(self._level(size))
+            if size >= self.N: break
+            size *= 2
+
+    def _level(self, size):
+        blocks = -(-self.N // size)
+        padded = np.concatenate((self.P, np.full(blocks * size - self.N, np.nan))).reshape(blocks, size)
+        diagonal = np.full((2, blocks), np.nan)  # the largest and the smallest GLN with both i, j in the block
+        if size > 1:
+            for block in range(blocks):
+                part = self.P[block * size:(block + 1) * size]
+                if len(part) > 1: diagonal[:, block] = extremum(part)[0], extremum(part, largest=False)[0]
+        return {'size': size, 'max': np.nanmax(padded, axis=1), 'min': np.nanmin(padded, axis=1),
+                'dmax': diagonal[0], 'dmin': diagonal[1]}
+
+    def level(self, cells, pixels):
+        # the finest level at which cells (rows or columns of linksLOOP) fit into pixels
+        k = 0
+        while k < len(self.levels) - 1 and -(-cells // self.levels[k]['size']) > pixels: k += 1
+        return k
+
+    def tile(self, k, i0, i1, j0, j1):
+        # (largest, smallest) GLN of the blocks [I][J] of level k covering columns i0:i1 and rows j0:j1 of
+        # linksLOOP, NaN for blocks below the diagonal
+        level = self.levels[k]
+        size = level['size']
+        I, J = np.arange(i0 // size, -(-i1 // size)), np.arange(j0 // size, -(-j1 // size))
+        upper = I[:, None] < J[None, :]
+        largest = np.where(upper, level['max'][J][None, :] - level['min'][I][:, None], np.nan)
+        smallest = np.where(upper, level['min'][J][None, :] - level['max'][I][:, None], np.nan)
+        diagonal = I[:, None] == J[None, :]
+        largest[diagonal] = level['dmax'][I[np.any(diagonal, axis=1)]]
+        smallest[diagonal] = level['dmin'][I[np.any(diagonal, axis=1)]]
+        return largest, smallest
+
+    def image(self, i0, i1, j0, j1, pixels):
+        # uint8 (rows, columns, 3) picture of columns i0:i1 and rows j0:j1 of linksLOOP at the finest level that fits
+        # into pixels, and its extent (left, right, bottom, top) in cells; every block shows the GLN of the larger
+        # magnitude of its extrema, blocks below the diagonal are white
+        k = self.level(max(i1 - i0, j1 - j0), pixels)
+        largest, smallest = self.tile(k, i0, i1, j0, j1)
+        shown = np.where(np.abs(largest) >= np.abs(smallest), largest, smallest).T
+        picture = rgb(np.nan_to_num(shown))
+        picture[np.isnan(shown)] = 255
+        size = self.levels[k]['size']
+        left, top = i0 // size * size, j0 // size * size
+        return picture, (left, left + shown.shape[1] * size, top + shown.shape[0] * size, top)
+
+
+def parse_arguments(argv):
+    # parse GLNtoPNG.py command line (argv[0] is the program); returns a dict of options or None if no arguments
+    if len(argv) == 1: return None
+    options = {'b1': False, 'e1': False, 'b2': False, 'e2': False, 'file': True, 'out': 1, 'close': (False, False),
+               'loop': 0, 'size': None, 'hashtag': "", 'ion': False, 'proc': None,
+               'memory': MEMORY, 'mmap': None, 'traj': False,
+               'tolerance': None, 'refresh': 100, 'cache': None,
+               'approx': None, 'sidecar': False, 'npz': 0, 'closures': False,
+               'random': 0}
+    ar = 1
+    components = []  # [filename, begin, end] of every comp, two or more
+    while ar < len(argv) and (len(components) < 2 or not argv[ar].startswith("-")):
+        components.append([argv[ar], False, False])
+        ar = ar + 1
+        if len(argv) > ar + 1 and (argv[ar]).isdigit():
+            components[-1][1:] = int(argv[ar]), int(argv[ar + 1])
+            ar = ar + 2
+    if len(components) < 2: raise ValueError("Error: at least two comps (xyz files) are needed.")
+    options['components'] = components
+
+    while ar < len(argv) - 1:  # -file, -out, -closed, -loop
+        if argv[ar] == "-file":
+            if argv[ar + 1] == "0": options['file'] = False
+        elif argv[ar] == "-out":
+            options['out'] = int(argv[ar + 1])
+            if options['out'] < 0 or options['out'] > 2: options['out'] = 1
+        elif argv[ar] == "-close" and argv[ar + 1] == "all":
+            options['closures'] = True
+        elif argv[ar] == "-close":
+            if len(argv[ar + 1]) != 2:
+                raise ValueError("Error: argument after -close must consists of two digits (0-1).")
+            options['close'] = (argv[ar + 1][0] == "1", argv[ar + 1][1] == "1")
+        elif argv[ar] == "-loop":
+            options['loop'] = int(argv[ar + 1])
+            if options['loop'] < 0 or options['loop'] > 2: options['loop'] = 0
+        elif argv[ar] == "-size":
+            size = int(argv[ar + 1])
+            if 50 < size < 10000: options['size'] = size
+        elif argv[ar] == "-ht":
+            options['hashtag'] = argv[ar + 1] + "_"
+        elif argv[ar] == "-ion":
+            if int(argv[ar + 1]) == 1:
+                options['ion'] = True
+                for component in components: component[1:] = False, False
+        elif argv[ar] == "-mem":
+            options['memory'] = max(1, int(argv[ar + 1])) * 2 ** 20
+        elif argv[ar] == "-mmap":
+            options['mmap'] = argv[ar + 1]
+        elif argv[ar] == "-traj":
+            options['traj'] = argv[ar + 1] == "1"
+        elif argv[ar] == "-tol":
+            options['tolerance'] = max(0.0, float(argv[ar + 1]))
+        elif argv[ar] == "-refresh":
+            options['refresh'] = max(1, int(argv[ar + 1]))
+        elif argv[ar] == "-cache":
+            options['cache'] = argv[ar + 1]
+        elif argv[ar] == "-approx":
+            options['approx'] = max(0.0, float(argv[ar + 1]))
+        elif argv[ar] == "-npz":
+            options['npz'] = int(argv[ar + 1])
+            if options['npz'] < 0 or options['npz'] > 2: options['npz'] = 0
+        elif argv[ar] == "-random":
+            options['random'] = max(0, int(argv[ar + 1]))
+        elif argv[ar] == "-sidecar":
+            options['sidecar'] = argv[ar + 1] == "1"
+        elif argv[ar] == "-proc":
+            options['proc'] = max(1, int(argv[ar + 1]))
+        else:
+            ar -= 1
+        ar += 2
+    if len(components) > 2 and (options['closures'] or options['close'][0] != options['close'][1]):
+        # all pairs of comps are closed alike; -close all and 10/01 are defined for two comps only
+        raise ValueError("Error: with more than two comps -close must be 00 or 11.")
+    if len(components) > 2 and options['random']:
+        raise ValueError("Error: -random is defined for two comps only.")
+    if len(components) > 2 and options['traj']:
+        raise ValueError("Error: -traj is defined for two comps only.")
+    if options['approx'] is not None and options['mmap']:
+        raise ValueError("Error: the segment matrix (-mmap) cannot be stored with approximated GLN (-approx).")
+    (options['filename1'], options['b1'], options['e1']), (options['filename2'], options['b2'], options['e2']) = \
+        components[:2]
+    return options
+
+
+def read_components(options, cwd=""):
+    # read (N, 3) coordinates of all comps of parsed GLNtoPNG options; relative paths are taken from cwd
+    return [read_chain(os.path.join(cwd, filename), begin, end, options['sidecar'])[1]
+            for filename, begin, end in options['components']]
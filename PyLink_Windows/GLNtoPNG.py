@@ -1,13 +1,11 @@
 #!/usr/bin/python
 import sys
-import math
+import io
+import contextlib
+import functools
+import multiprocessing as mp
 from PIL import Image, ImageDraw, ImageFont
-
-EPS = 0.0001
-g = 0.69  # TRESHOLDS for lasso classification
-h = 0.55
-sl = 1.5
-R = 2  # precision for rounding an output
+import gln
 
 WIDTH = 340
 HEIGHT = 340
@@ -15,154 +13,8 @@ FONT_SIZE = int(WIDTH / 27)
 FONT_SIZE_SMALL = int(WIDTH / 35)
 FONT_TYPE = "arial.ttf"
 FONT_TYPE_SMALL = "arial.ttf"
-
-
-def compareEq(a, b):
-    if not type(a) == list and not type(a) == tuple:
-        return abs(a - b) < EPS
-    else:
-        assert len(a) == len(b)
-        for i in range(len(a)):
-            if not compareEq(a[i], b[i]): return False
-        return True
-
-
-def compareGeq(a, b): return a > b - EPS
-
-
-def compareGt(a, b): return a > b + EPS
-
-
-def scalarProduct(a, b):
-    # return scalar product of two vectors (assumption: a,b vectors (lists) of three double numbers
-    assert (type(a) == list and type(b) == list and len(a) == 3 and len(b) == 3)
-    return (a[0] * b[0] + a[1] * b[1] + a[2] * b[2])
-
-
-def vectorProduct(a, b):
-    # return vector product of two vectors (assumption: a,b vectors (lists) of three double numbers
-    assert (type(a) == list and type(b) == list and len(a) == 3 and len(b) == 3)
-    return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]
-
-
-def normalizedVectorProduct(a, b):
-    # return vp := a x b / |a x b| (assumption: a,b vectors (lists) of three double numbers
-    assert (type(a) == list and type(b) == list and len(a) == 3 and len(b) == 3)
-    v = vectorProduct(a, b)
-    d = (v[0] * v[0] + v[1] * v[1] + v[2] * v[2]) ** 0.5
-    if d == 0: return 0
-    return [el / d for el in v]
-
-
-def fileCheck(fn):
-    try:
-        open(fn, "r")
-        return 1
-    except IOError:
-        print(("Error: File", fn, "does not appear to exist.\n"))
-        return 0
-
-
-def chainRead(filename, begin=False, end=False):
-    # Read coordinates from .xyz file, cuts them from id "begin" to "end", and put them into the returned list; empty list -> error/problem -> end of the program; works with 4 and 5 columns file.
-    if (not fileCheck(filename)): return []
-    comp = []
-    b, e = begin, end
-    if begin != False and begin > end: b, e = end, begin
-
-    k, x, y, z = -1, -1, -1, -1
-    f = open(filename)
-    for line in f.readlines():
-        if len(line) > 1:
-            k2, x2, y2, z2 = [float(x) for x in line.split()[:4]]
-            if compareEq([k, x, y, z], [k2, x2, y2, z2]):
-                print(("Error: There were two identical atoms with the index", k,
-                      "in the file. Program is done becouse of that.\n"))
-                return []
-            k, x, y, z = k2, x2, y2, z2
-            if (k >= b and k <= e) or (not begin and not end):
-                comp.append((int(k), (x, y, z)))
-    f.close()
-    return comp
-
-
-def CompsOverlie(comp1, comp2):
-    # Return True if there are points on two comps that overlie
-    for i in range(len(comp1)):
-        for j in range(len(comp2)):
-            if compareEq(comp1[i][1], comp2[j][1]): return True
-    return False
-
-
-def linking_oneSegment(A1, A2, B1, B2):
-    # returns self linking number between A1A2 and B1B2
-    # Ken's notations
-
-    a = [B1[i] - A1[i] for i in [0, 1, 2]]
-    b = [B2[i] - A1[i] for i in [0, 1, 2]]
-    c = [B2[i] - A2[i] for i in [0, 1, 2]]
-    d = [B1[i] - A2[i] for i in [0, 1, 2]]
-
-    n1 = normalizedVectorProduct(a, b)
-    n2 = normalizedVectorProduct(b, c)
-    n3 = normalizedVectorProduct(c, d)
-    n4 = normalizedVectorProduct(d, a)
-    if n1 == 0 or n2 == 0 or n3 == 0 or n4 == 0:
-        print("Problem with Vector Product...", A1, A2, B1, B2, a, b, c, d)
-        return 0
-
-    f = [B2[i] - B1[i] for i in [0, 1, 2]]
-    h = [A2[i] - A1[i] for i in [0, 1, 2]]
-    s = vectorProduct(f, h)
-
-    x = scalarProduct(s, a)
-    sign = 0
-    if compareEq(x, 0): x, sign = 0, 0
-    if x > 0: sign = 1
-    if x < 0: sign = -1
-
-    as1, as2, as3, as4 = scalarProduct(n1, n2), scalarProduct(n2, n3), scalarProduct(n3, n4), scalarProduct(n4, n1)
-    if (compareGeq(as1, 1)): as1 = 1
-    if (compareGeq(as2, 1)): as2 = 1
-    if (compareGeq(as3, 1)): as3 = 1
-    if (compareGeq(as4, 1)): as4 = 1
-    if (compareGeq(-1, as1)): as1 = -1
-    if (compareGeq(-1, as2)): as2 = -1
-    if (compareGeq(-1, as3)): as3 = -1
-    if (compareGeq(-1, as4)): as4 = -1
-
-    return sign * (math.asin(as1) + math.asin(as2) + math.asin(as3) + math.asin(as4)) / (4 * math.pi)
-
-
-def linking_components(comp1, comp2):
-    N1, N2 = len(comp1), len(comp2)
-    links = []  # links[i][j] = GLN ( comp1<i,i+1>, comp2<j,j+1> ) - GLN between each pair of segments: ONE SEGMENT with ONE SEGMENT
-    #    links = (N1-1)*[(N2-1)*[0]]
-    for i in range(N1 - 1): links.append((N2 - 1) * [0])
-
-    for i in range(N1 - 1):
-        for j in range(N2 - 1):
-            links[i][j] = linking_oneSegment(comp1[i][1], comp1[i + 1][1], comp2[j][1], comp2[j + 1][1])
-
-    vlinksLOOP1, vlinksLOOP2 = (N2 - 1) * [0], (N1 - 1) * [
-        0]  # vlinksLOOP1[j] = GLN ( comp1, comp2<j,j+1> ) - GLN between WHOLE comp1 (as a LOOP1) and ONE SEGMENT of comp2
-    for i in range(N1 - 1):
-        for j in range(N2 - 1):
-            vlinksLOOP1[j] += links[i][j]
-            vlinksLOOP2[i] += links[i][j]
-
-    linksLOOP1, linksLOOP2 = [], []  # linksLOOP1[i][j] = GLN ( comp1, comp2<i-j> ) - GLN between WHOLE comp1 (as a LOOP1) and PART of comp2 <i-j>
-    for j in range(N2): linksLOOP1.append(N2 * [0])
-    for i in range(N1): linksLOOP2.append(N1 * [0])
-
-    for j1 in range(N2):
-        for j2 in range(j1 + 1, N2):
-            linksLOOP1[j1][j2] = linksLOOP1[j1][j2 - 1] + vlinksLOOP1[j2 - 1]
-    for i1 in range(N1):
-        for i2 in range(i1 + 1, N1):
-            linksLOOP2[i1][i2] = linksLOOP2[i1][i2 - 1] + vlinksLOOP2[i2 - 1]
-
-    return linksLOOP1, linksLOOP2
+DEFAULT_SIZE = (WIDTH, HEIGHT)
+FONTS = {}  # fonts loaded once per process, (type, size) -> font
 
 
 def colorFromGLN(gln):
@@ -176,26 +28,24 @@ def colorFromGLN(gln):
         return (0, 0, int(255 * 1 / (gln * gln)))
 
 
-def writePng(linksLOOP, filename, xxx_todo_changeme, xxx_todo_changeme1):
+def loadFont(fontType, size):
+    if (fontType, size) not in FONTS: FONTS[(fontType, size)] = ImageFont.truetype(fontType, size)
+    return FONTS[(fontType, size)]
+
+
+def writePng(P, filename, xxx_todo_changeme, xxx_todo_changeme1):
+    # P - prefix sums of a loop, linksLOOP[i][j] = P[j] - P[i]
     (mmax, xmax, ymax) = xxx_todo_changeme
     (mmin, xmin, ymin) = xxx_todo_changeme1
-    CHAIN = len(linksLOOP)
-    KLATKA = int(WIDTH / CHAIN)
+    CHAIN = len(P)
     FLOATKLATKA = float(WIDTH) / CHAIN
 
-    image = Image.new('RGB', (WIDTH, HEIGHT), 'white')
+    image = Image.fromarray(gln.heatmap(P, WIDTH, HEIGHT), 'RGB')
     draw = ImageDraw.Draw(image)
 
-    for i in range(CHAIN):
-        for j in range(i + 1, CHAIN):
-            color = colorFromGLN(linksLOOP[i][j])
-            for x in range(0, KLATKA + 1):
-                for y in range(0, KLATKA + 1):
-                    draw.point((int(i * FLOATKLATKA) + x, int(j * FLOATKLATKA) + y), fill=color)
-
     # Extrema
-    font = ImageFont.truetype(FONT_TYPE, FONT_SIZE)
-    color_min, color_max = colorFromGLN(linksLOOP[xmin][ymin]), colorFromGLN(linksLOOP[xmax][ymax])
+    font = loadFont(FONT_TYPE, FONT_SIZE)
+    color_min, color_max = colorFromGLN(P[ymin] - P[xmin]), colorFromGLN(P[ymax] - P[xmax])
 
     xmax = int(xmax * FLOATKLATKA) if int(xmax * FLOATKLATKA) < HEIGHT - FONT_SIZE else HEIGHT - FONT_SIZE - 5
     ymax = int(ymax * FLOATKLATKA) if int(ymax * FLOATKLATKA) < WIDTH - FONT_SIZE else WIDTH - FONT_SIZE - 5
@@ -218,7 +68,7 @@ def writePng(linksLOOP, filename, xxx_todo_changeme, xxx_todo_changeme1):
     draw.text((0.60 * WIDTH, 0.15 * WIDTH), "max GLN = " + str(mmax), font=font, fill=(0, 0, 0, 255))
 
     # Osie
-    font = ImageFont.truetype(FONT_TYPE_SMALL, FONT_SIZE_SMALL)
+    font = loadFont(FONT_TYPE_SMALL, FONT_SIZE_SMALL)
     step = int(CHAIN / 5) / 10 * 10 if CHAIN > 150 else int(CHAIN / 5) / 5 * 5 if CHAIN > 50 else int(CHAIN / 5)
     for x in range(1, 6):
         draw.text((x * step * FLOATKLATKA, HEIGHT - FONT_SIZE_SMALL - 2), str(x * step), font=font,
@@ -228,155 +78,185 @@ def writePng(linksLOOP, filename, xxx_todo_changeme, xxx_todo_changeme1):
     image.save(filename + '.png')
 
 
+def compName(filename, begin, end):
+    # name of a comp in the table of all pairs: the file name without a path and an extension (and its range)
+    name = filename.replace("\\", "/").split("/")[-1]
+    if "." in name: name = name[:name.rfind(".")]
+    if begin != False: name += "_L" + str(begin) + "-" + str(end)
+    return name
+
+
+def printPairs(options):
+    # GLN for all pairs of (more than two) comps, one line per pair
+    comps = gln.read_components(options)
+    cache = gln.Cache(options['cache']) if options['cache'] else None
+    names = [compName(*component) for component in options['components']]
+    loop = options['loop']
+    print(("comp1 comp2 wh1 max1 min1 cl1 wh2 max2 min2 cl2" + (" bound" if options['approx'] is not None else "")))
+    for k, l, result in gln.all_pairs(comps, all(options['close']), loop, options['proc'], options['memory'], cache,
+                                      options['ion'], options['approx']):
+        if type(result) == str:
+            print((names[k] + " " + names[l] + " " + result))
+            continue
+        line = names[k] + " " + names[l]
+        for r, active in ((result['1'], loop == 0 or loop == 1), (result['2'], loop == 0 or loop == 2)):
+            line += " " + (" ".join([str(r['wh']), str(r['max']), str(r['min']), r['cl']]) if active else "- - - -")
+        if 'bound' in result: line += " %.2g" % result['bound']
+        print(line)
+
+
+def printTimeSeries(options):
+    # GLN of the two comps in every frame of trajectory files (converter.py -t), one line per frame
+    loop = options['loop']
+    print("frame time wh1 max1 min1 cl1 wh2 max2 min2 cl2")
+    for frame, time, result in gln.time_series(options):
+        line = str(frame) + " " + str(time)
+        if type(result) == str:
+            print((line + " " + result))
+            continue
+        for r, active in ((result['1'], loop == 0 or loop == 1), (result['2'], loop == 0 or loop == 2)):
+            line += " " + (" ".join([str(r['wh']), str(r['max']), str(r['min']), r['cl']]) if active else "- - - -")
+        print(line)
+        sys.stdout.flush()
+
+
+def printClosures(options):
+    # GLN of the two comps for all four ways of closing them (-close all), one line per closure
+    comp1, comp2 = gln.read_components(options)
+    loop = options['loop']
+    print("close wh1 max1 min1 cl1 wh2 max2 min2 cl2")
+    for close, result in sorted(gln.compute_closures(comp1, comp2, loop, options['memory']).items()):
+        line = str(int(close[0])) + str(int(close[1]))
+        if type(result) == str:
+            print((line + " " + result))
+            continue
+        for r, active in ((result['1'], loop == 0 or loop == 1), (result['2'], loop == 0 or loop == 2)):
+            line += " " + (" ".join([str(r['wh']), str(r['max']), str(r['min']), r['cl']]) if active else "- - - -")
+        print(line)
+
+
+def printRandomClosures(options):
+    # distribution of the whole GLN of the two comps closed through -random random points each
+    comp1, comp2 = gln.read_components(options)
+    try:
+        result = gln.random_closures(comp1, comp2, gln.closure_points(comp1, options['random']),
+                                     gln.closure_points(comp2, options['random']), memory=options['memory'])
+    except ValueError as e:
+        print(e)
+        return
+    print(("*RANDOM CLOSURES " + str(options['random']) + " wh mean: " + str(round(result['mean'], gln.R) + 0.0) + " " +
+           " ".join(["q" + str(q) + ": " + str(round(v, gln.R) + 0.0) for q, v in sorted(result['quantiles'].items())])))
+    counts, edges = result['histogram']
+    print(("*HISTOGRAM " + " ".join([str(round(e, gln.R)) + ":" + str(c) for e, c in zip(edges, counts)])))
+
+
 def main():
     # Reading arguments
     if (len(sys.argv) == 1):
         print(("*\nUsage of the program: python " + sys.argv[0] + " <filename1> (<begin of a comp1> <end of a comp1>) "
                                                                  "<filename2> (<begin of a comp2> <end of a comp2>) "
+                                                                 "(<filename3> (<begin> <end>) ...) "
                                                                  "(<-additional_option and argument>^n)"))
-        print("*\nAdditional options:\n   -> -file (0,1): if we create png file/s; implicitly file=1;\n   "
-              "-> -out (0,1,2): output on the screen, 0:none, 1:short, 2:long<compatybile with Wanda's GLN paper>; "
-              "implicitly out=1;\n   -> -close (00,10,01,11): if we close 1st/2nd comp; implicitly close=00;\n   "
-              "-> -loop (0,1,2): if we calculate bots \"glns\", 0:both, 1:only 1st comp as a loop, 2:only 2nd comp "
-              "as a loop; implicitly loop=0;\n   -> -size (positive int<10000): size of the png picture; implicitly "
-              "size=WIDTH(at top)=500 for now;\n   -> -ht (string): if you want to have that string at the beginning "
-              "of png files.\n*")
+        print("*\nAdditional options:\n   -> -file (0,1): if we create png file/s; implicitly file=1;\n   -> -out "
+              "(0,1,2): output on the screen, 0:none, 1:short, 2:long<compatybile with Wanda's GLN paper>; "
+              "implicitly out=1;\n   -> -close (00,10,01,11,all): if we close 1st/2nd comp, all: GLN for all four "
+              "closures at once printed as one table (no png files); implicitly close=00;\n   -> -loop (0,1,2): if "
+              "we calculate bots \"glns\", 0:both, 1:only 1st comp as a loop, 2:only 2nd comp as a loop; "
+              "implicitly loop=0;\n   -> -size (positive int<10000): size of the png picture; implicitly "
+              "size=WIDTH(at top)=500 for now;\n   -> -ht (string): if you want to have that string at the "
+              "beginning of png files;\n   -> -proc (positive int): number of processes for more than two comps; "
+              "implicitly all CPUs;\n   -> -mem (positive int): memory limit (MB) for the parts of the segment "
+              "matrix computed at once; implicitly 256;\n   -> -mmap (string): file to store the whole segment "
+              "matrix (numpy.memmap of float64);\n   -> -traj (0,1): if files are trajectories (frames starting "
+              "with \"t <time>\" lines, converter.py -t), GLN is printed for every frame, no png files; implicitly "
+              "traj=0;\n   -> -tol (non-negative float): with -traj 1, only segments moved more than tol since "
+              "their last calculation are calculated again in a frame; implicitly all segments are;\n   -> "
+              "-refresh (positive int): with -tol, every refresh frames all segments are calculated; implicitly "
+              "100;\n   -> -cache (string): directory for cached results, GLN of the same comps with the same "
+              "options is read from there;\n   -> -approx (non-negative float): GLN is approximated for distant "
+              "parts of comps with the absolute error at most approx, the bound achieved is printed, not with "
+              "-mmap; implicitly exact;\n   -> -sidecar (0,1): if coordinates of xyz files are also saved to (and "
+              "then read from) <file>.xyz.npz; implicitly sidecar=0;\n   -> -npz (0,1,2): if we also save GLN "
+              "matrices with their extrema and classes to npz files, 0:no, 1:float32, 2:int16 (quantized); with "
+              "-file 0 only npz files are written; implicitly npz=0;\n   -> -random (positive int): both comps are "
+              "closed through that many random points (on the sphere of radius 50 around the middle of their ends, "
+              "as converter.py --closure one_point) and the mean, quantiles and histogram (bin start:count) of "
+              "whole GLN are printed, no png files; implicitly none.\n*\nWith more than two comps GLN is "
+              "calculated for all pairs of them and printed as one table (no png files); -close 11 closes all "
+              "comps (only 00 and 11 are allowed, -random and -traj are not).\n*")
+        print(("Job list: python " + sys.argv[0] + " -jobs <file> (-proc <positive int>): every line of the file "
+               "(- for stdin) is run as the arguments of one call of the program, all in one process (or in proc "
+               "processes); the output of every job follows a \"*JOB <line>\" line.\n*"))
         return 0
+    if sys.argv[1] == "-jobs":
+        return runJobs(sys.argv)
+    return run(sys.argv)
+
 
-    b1, e1, b2, e2 = False, False, False, False
-    ar = 1
-    filename1 = sys.argv[ar]
-    ar = ar + 1
-    if (sys.argv[ar]).isdigit():
-        b1, e1 = int(sys.argv[ar]), int(sys.argv[ar + 1])
-        ar = ar + 2
-    filename2 = sys.argv[ar]
-    ar = ar + 1
-    if len(sys.argv) > ar and (sys.argv[ar]).isdigit():
-        b2, e2 = int(sys.argv[ar]), int(sys.argv[ar + 1])
-        ar = ar + 2
-
-    # Read optional arguments
-    pngfile = True  # if we create pngfile/s
-    out = 1  # output on the screen, 0-none, 1-short, 2-long
-    cl1, cl2 = False, False  # if we threat 1/2 comp as closed
-    loop = 0  # if we check both combinations - 0-both, 1-comp1 as a loop, 2-comp2 as a loop
-    hashtag = ""
-
-    while ar < len(sys.argv) - 1:  # -file, -out, -closed, -loop
-        if sys.argv[ar] == "-file":
-            if sys.argv[ar + 1] == "0": pngfile = False
-            ar += 2
-        elif sys.argv[ar] == "-out":
-            out = int(sys.argv[ar + 1])
-            if out < 0 or out > 2: out = 1
-            ar += 2
-        elif sys.argv[ar] == "-close":
-            if len(sys.argv[ar + 1]) != 2:
-                print("Error: argument after -close must consists of two digits (0-1).")
-                return 0
-            if sys.argv[ar + 1][0] == "1": cl1 = True
-            if sys.argv[ar + 1][1] == "1": cl2 = True
-            ar += 2
-        elif sys.argv[ar] == "-loop":
-            loop = int(sys.argv[ar + 1])
-            if loop < 0 or loop > 2: loop = 0
-            ar += 2
-        elif sys.argv[ar] == "-size":
-            size = int(sys.argv[ar + 1])
-            if size < 10000 or size > 50: WIDTH, HIGHT = size, size
-            ar += 2
-        elif sys.argv[ar] == "-ht":
-            hashtag = sys.argv[ar + 1] + "_"
-            ar += 2
-        elif sys.argv[ar] == "-ion":
-            if int(sys.argv[ar + 1]) == 1: b1, e1, b2, e2 = False, False, False, False
-            ar += 2
-
-    # Creating components
-    comp1 = chainRead(filename1, b1, e1)
-    if cl1: comp1.append(comp1[0])
-    comp2 = chainRead(filename2, b2, e2)
-    if cl2: comp2.append(comp2[0])
-    N1, N2 = len(comp1), len(comp2)
-
-    if N1 == 0 or N2 == 0:
-        print("empty-comp . . . . . . . . . . . . . . .")
+def run(argv, proc=None):
+    # one call of the program with the arguments argv (argv[0] is the program); proc - if given, overrides -proc
+    try:
+        options = gln.parse_arguments(argv)
+    except ValueError as e:
+        print(e)
+        return 0
+    if proc: options['proc'] = proc
+    global WIDTH, HEIGHT, FONT_SIZE, FONT_SIZE_SMALL
+    WIDTH, HEIGHT = (options['size'], options['size']) if options['size'] else DEFAULT_SIZE
+    FONT_SIZE, FONT_SIZE_SMALL = int(WIDTH / 27), int(WIDTH / 35)
+    if options['traj']:
+        printTimeSeries(options)
         return 0
-    if N1 == 1 or N2 == 1:
-        print("1-length-comp . . . . . . . . . . . . . . .")
+    if options['closures']:
+        printClosures(options)
         return 0
-    if CompsOverlie(comp1, comp2):
-        print("comps-overlie . . . . . . . . . . . . . . .")
+    if options['random']:
+        printRandomClosures(options)
         return 0
+    if len(options['components']) > 2:
+        printPairs(options)
+        return 0
+    filename1, b1, e1 = options['filename1'], options['b1'], options['e1']
+    filename2, b2, e2 = options['filename2'], options['b2'], options['e2']
+    pngfile, out, loop, hashtag = options['file'], options['out'], options['loop'], options['hashtag']
 
-    # Calculate linking
-    linksLOOP1, linksLOOP2 = linking_components(comp1, comp2)
+    # Creating components and calculating linking
+    comp1, comp2 = gln.read_components(options)
+    try:
+        if options['cache'] and not options['mmap']:
+            result = gln.Cache(options['cache']).compute(comp1, comp2, options['close'], loop, options['ion'],
+                                                         matrices=False, memory=options['memory'],
+                                                         tolerance=options['approx'])
+        else:
+            result = gln.compute(comp1, comp2, options['close'], loop, matrices=False, memory=options['memory'],
+                                 out=options['mmap'], tolerance=options['approx'])
+    except ValueError as e:
+        print(e)
+        return 0
+    N1, N2, r1, r2 = result['N1'], result['N2'], result['1'], result['2']
 
     # Preparing data for out
     #    out =1: wh1 max1 min1 cl1
     #    out =2: spacja N2 wh1: wh1+: max1: min1: max10: min10: cl
 
-    whole1, whole2 = linksLOOP1[0][N2 - 1], linksLOOP2[0][N1 - 1]
-    max1, xmax1, ymax1, min1, xmin1, ymin1, max2, xmax2, ymax2, min2, xmin2, ymin2 = 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
-    max10, ymax10, min10, ymin10, max20, ymax20, min20, ymin20 = 0, 0, 0, 0, 0, 0, 0, 0
-
-    if loop == 0 or loop == 2:
-        for i1 in range(N1):
-            for i2 in range(i1 + 1, N1):
-                if linksLOOP2[i1][i2] > max2: max2, xmax2, ymax2 = linksLOOP2[i1][i2], i1, i2
-                if linksLOOP2[i1][i2] < min2: min2, xmin2, ymin2 = linksLOOP2[i1][i2], i1, i2
-        if linksLOOP2[0][i1] > max20: max20, ymax20 = linksLOOP2[0][i1], i1
-        if linksLOOP2[0][i1] < min20: min20, ymin20 = linksLOOP2[0][i1], i1
-    if loop == 0 or loop == 1:
-        for j1 in range(N2):
-            for j2 in range(j1 + 1, N2):
-                if linksLOOP1[j1][j2] > max1: max1, xmax1, ymax1 = linksLOOP1[j1][j2], j1, j2
-                if linksLOOP1[j1][j2] < min1: min1, xmin1, ymin1 = linksLOOP1[j1][j2], j1, j2
-        if linksLOOP1[0][j1] > max10: max10, ymax10 = linksLOOP1[0][j1], j1
-        if linksLOOP1[0][j1] < min10: min10, ymin10 = linksLOOP1[0][j1], j1
-
-    whole1, whole2 = round(whole1, R), round(whole2, R)
-    max1, min1, max2, min2, max10, min10, max20, min20 = round(max1, R), round(min1, R), round(max2, R), round(min2,
-                                                                                                               R), round(
-        max10, R), round(min10, R), round(max20, R), round(min20, R)
-
-    amin1, amin2, awhole1, awhole2 = abs(min1), abs(min2), abs(whole1), abs(whole2)
-    if max(max1, amin1) >= sl:
-        cl1 = "LS"
-    elif max(max1, amin1) < g:
-        cl1 = "L0"
-    elif amin1 < g <= max1 or amin1 >= g > max1:
-        cl1 = "L1"
-    elif awhole1 < h:
-        cl1 = "L2+"
-    else:
-        cl1 = "L3+"
-    if max(max2, amin2) >= sl:
-        cl2 = "LS"
-    elif max(max2, amin2) < g:
-        cl2 = "L0"
-    elif amin2 < g <= max2 or amin2 >= g > max2:
-        cl2 = "L1"
-    elif awhole2 < h:
-        cl2 = "L2+"
-    else:
-        cl2 = "L3+"
-
     if out == 1:
         if loop == 0 or loop == 1:
-            print(( "*LOOP1 wh: " + str(whole1) + " max: " + str(max1) + " min: " + str(min1) + " cl: " + cl1))
+            print(( "*LOOP1 wh: " + str(r1['wh']) + " max: " + str(r1['max']) + " min: " + str(r1['min']) +
+                    " cl: " + r1['cl']))
         if loop == 0 or loop == 2:
-            print(( "*LOOP2 wh: " + str(whole2) + " max: " + str(max2) + " min: " + str(min2) + " cl: " + cl2))
+            print(( "*LOOP2 wh: " + str(r2['wh']) + " max: " + str(r2['max']) + " min: " + str(r2['min']) +
+                    " cl: " + r2['cl']))
     if out == 2:
         if loop == 0 or loop == 1:
-            print((" " + str(N2) + " wh1: " + str(whole1) + " wh1+: 0 max1: " + str(max1) + " min1: " + str(min1) +
-                  " max10: " + str(max10) + " " + str(ymax10) + " min10: " + str(min10) + " " + str(ymin10) +
-                  " cl1: " + cl1))
+            print((" " + str(N2) + " wh1: " + str(r1['wh']) + " wh1+: 0 max1: " + str(r1['max']) + " min1: " +
+                   str(r1['min']) + " max10: " + str(r1['max0']) + " " + str(r1['ymax0']) + " min10: " +
+                   str(r1['min0']) + " " + str(r1['ymin0']) + " cl1: " + r1['cl']))
         if loop == 0 or loop == 2:
-            print((" " + str(N1) + " wh2: " + str(whole2) + " wh2+: 0 max2: " + str(max2) + " min2: " + str(min2) +
-                  " max20: " + str(max20) + " " + str(ymax20) + " min20: " + str(min20) + " " + str(ymin20) +
-                  " cl2: " + cl2))
+            print((" " + str(N1) + " wh2: " + str(r2['wh']) + " wh2+: 0 max2: " + str(r2['max']) + " min2: " +
+                   str(r2['min']) + " max20: " + str(r2['max0']) + " " + str(r2['ymax0']) + " min20: " +
+                   str(r2['min0']) + " " + str(r2['ymin0']) + " cl2: " + r2['cl']))
+    if out != 0 and 'bound' in result:
+        print(("*GLN error bound: %.2g" % result['bound']))
 
     i1, i2 = filename1.rfind("/"), filename1.rfind(".")
     n1 = filename1[i1 + 1:] if i2 == -1 else filename1[
@@ -402,9 +282,55 @@ def main():
     name1 = name1 + hashtag + "GLN_" + n1 + "-" + n2
     name2 = name2 + hashtag + "GLN_" + n2 + "-" + n1
 
+    if options['npz']:
+        if loop == 0 or loop == 1: gln.save_matrix(name1 + ".npz", result['P1'], r1, options['npz'] == 2)
+        if loop == 0 or loop == 2: gln.save_matrix(name2 + ".npz", result['P2'], r2, options['npz'] == 2)
     if pngfile:
-        if loop == 0 or loop == 1: writePng(linksLOOP1, name1, (max1, xmax1, ymax1), (min1, xmin1, ymin1))
-        if loop == 0 or loop == 2: writePng(linksLOOP2, name2, (max2, xmax2, ymax2), (min2, xmin2, ymin2))
+        if loop == 0 or loop == 1: writePng(result['P1'], name1, (r1['max'], r1['xmax'], r1['ymax']),
+                                            (r1['min'], r1['xmin'], r1['ymin']))
+        if loop == 0 or loop == 2: writePng(result['P2'], name2, (r2['max'], r2['xmax'], r2['ymax']),
+                                            (r2['min'], r2['xmin'], r2['ymin']))
+
+
+def runJob(line, proc=None):
+    # output of run for one line of a job list; an error ends only that job. Jobs run in a process pool are given
+    # proc=1, as the workers of the pool cannot start processes of their own for more than two comps
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            run([sys.argv[0]] + line.split(), proc)
+        except Exception as e:
+            print(("Error: " + type(e).__name__ + ": " + str(e)))
+    return output.getvalue()
+
+
+def runJobs(argv):
+    # -jobs <file> (-proc <n>): all lines of the file (or stdin for -) as separate calls of the program
+    try:
+        jobs = sys.stdin if argv[2] == "-" else open(argv[2])
+    except (IndexError, IOError):
+        print(("Error: File", argv[2] if len(argv) > 2 else "", "does not appear to exist.\n"))
+        return 0
+    lines = [line.strip() for line in jobs if line.strip() and not line.startswith("#")]
+    if jobs is not sys.stdin: jobs.close()
+    try:
+        processes = max(1, int(argv[4])) if len(argv) > 4 and argv[3] == "-proc" else 1
+    except ValueError:
+        print("Error: argument after -proc must be a positive int.")
+        return 0
+    if processes > 1:
+        pool = mp.Pool(processes)
+        outputs = pool.imap(functools.partial(runJob, proc=1), lines)
+    else:
+        outputs = (runJob(line) for line in lines)
+    for line, output in zip(lines, outputs):
+        print(("*JOB " + line))
+        sys.stdout.write(output)
+        sys.stdout.flush()
+    if processes > 1:
+        pool.close()
+        pool.join()
+    return 0
 
 
 ##########################
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# converter.py --lasso against GLNtoPNG.py run on the .xyz files written by converter.py, for a chain with a HETATM
+# residue (MSE), of which the .xyz file holds only the first atom (N), not CA
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONVERTER = os.path.join(ROOT, 'PyLink', 'converter.py')
+GLNTOPNG = os.path.join(ROOT, 'PyLink_Linux', 'GLNtoPNG.py')
+
+
+def atom_line(record, serial, name, resname, resseq, xyz, element):
+    return "%-6s%5d  %-3s %3s A%4d    %8.3f%8.3f%8.3f  1.00 20.00          %2s" % (
+        record, serial, name, resname, resseq, xyz[0], xyz[1], xyz[2], element)
+
+
+def link_line(name1, resname1, resseq1, name2, resname2, resseq2):
+    return "LINK         %-3s %3s A%4d                 %-3s %3s A%4d     1555   1555  1.33" % (
+        name1, resname1, resseq1, name2, resname2, resseq2)
+
+
+def write_pdb(path):
+    # one chain of 30 residues: an amide bridge GLU 5 - LYS 25 closes a loop with MSE 27 (HETATM) in its C-tail
+    resnames = {5: 'GLU', 25: 'LYS', 27: 'MSE'}
+    lines = ["HEADER    TEST PROTEIN                            01-JAN-00   1TST",
+             "EXPDTA    X-RAY DIFFRACTION",
+             "SEQRES   1 A   30  " + " ".join(resnames.get(r, 'ALA') for r in range(1, 14)),
+             "SEQRES   2 A   30  " + " ".join(resnames.get(r, 'ALA') for r in range(14, 27)),
+             "SEQRES   3 A   30  " + " ".join(resnames.get(r, 'ALA') for r in range(27, 31)),
+             link_line('C', 'ALA', 26, 'N', 'MSE', 27), link_line('C', 'MSE', 27, 'N', 'ALA', 28),
+             link_line('CD', 'GLU', 5, 'NZ', 'LYS', 25)]
+    rng = np.random.default_rng(16)
+    p, serial = np.zeros(3), 1
+    for r in range(1, 31):
+        v = rng.normal(size=3)
+        p = p + 3.8 * v / np.linalg.norm(v)
+        name = resnames.get(r, 'ALA')
+        record = "HETATM" if name == 'MSE' else "ATOM"
+        atoms = [('N', p - [1.2, 0.4, 0.3], 'N'), ('CA', p, 'C'), ('C', p + [1.0, 0.5, 0.2], 'C')]
+        if name == 'GLU': atoms.append(('CD', p + [0, 1.5, 0], 'C'))
+        if name == 'LYS': atoms.append(('NZ', p + [0, 1.5, 0], 'N'))
+        for atom_name, xyz, element in atoms:
+            lines.append(atom_line(record, serial, atom_name, name, r, xyz, element))
+            serial += 1
+    lines += ["TER   %5d      ALA A  30" % serial, "END"]
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class LassoTest(unittest.TestCase):
+    def test_lasso_same_as_glntopng(self):
+        directory = tempfile.mkdtemp()
+        write_pdb(os.path.join(directory, 'test.pdb'))
+        run = lambda *argv: subprocess.run([sys.executable] + list(argv), cwd=directory, check=True,
+                                           capture_output=True, text=True,
+                                           env=dict(os.environ, PYTHONPATH=os.path.join(ROOT, 'PyLink'))).stdout
+        table = run(CONVERTER, 'test.pdb', '--lasso').split("\n")
+        run(CONVERTER, 'test.pdb')  # the .xyz files
+        with open(os.path.join(directory, 'test.pdb_A.xyz')) as f:
+            xyz = [line.split() for line in f if line.strip()]
+        self.assertIn(['27', 'MSE'], [[line[0], line[-1]] for line in xyz])
+        first, last = xyz[0][0], xyz[-1][0]
+
+        rows = [line.split() for line in table[1:] if line.startswith('AMIDE')]
+        self.assertEqual(len(rows), 1)
+        bridge, chain, res1, res2 = rows[0][:4]
+        self.assertEqual((chain, res1, res2), ('A', '5', '25'))
+        for tail, values in ((str(first) + ' ' + str(int(res1) - 1), rows[0][4:8]),
+                             (str(int(res2) + 1) + ' ' + str(last), rows[0][8:12])):
+            output = run(GLNTOPNG, 'test.pdb_A.xyz', res1, res2, 'test.pdb_A.xyz', *tail.split(), '-close', '10',
+                         '-loop', '1', '-file', '0').split()
+            # *LOOP1 wh: <wh> max: <max> min: <min> cl: <cl>
+            self.assertEqual(values, [output[2], output[4], output[6], output[8]])
+
+
+if __name__ == '__main__':
+    unittest.main()